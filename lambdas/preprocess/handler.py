@@ -1,144 +1,252 @@
-import os
 import json
-import boto3
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from user_ops import register_review
-import re
-import pathlib
-
-import nltk
-
-# Find folder 'nltk_data' via relative path
-ROOT = pathlib.Path(__file__).parent
-NLTK_DATA = ROOT / "nltk_data"
-STOP_FILE = ROOT / "stopwords.txt"
-
-# If it exists -> add to the nltk paths
-if NLTK_DATA.exists():
-    nltk.data.path.append(str(NLTK_DATA))
-
-if not STOP_FILE.exists():
-    raise FileNotFoundError(f"stopwords file not found: {STOP_FILE}")
-
-# Read in the given stopwords.txt
-with STOP_FILE.open(encoding="utf-8") as fh:
-    STOP_WORDS = {
-        ln.strip().lower()
-        for ln in fh
-        if ln.strip() and not ln.lstrip().startswith("#")
-    }
-
-
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
-
-
-LEMMATISER = WordNetLemmatizer()
-ALPHA_RE = re.compile(r"[A-Za-z]+")
-
-
-# Configure LocalStack endpoint and region from environment.
-host = os.getenv("LOCALSTACK_HOSTNAME", "localhost")
-port = os.getenv("EDGE_PORT", "4566")
-ENDPOINT = f"http://{host}:{port}"
-REGION = os.getenv("AWS_REGION", "us-east-1")
-
-# Initialize SSM client and fetch the DynamoDB table name from Parameter Store.
-ssm = boto3.client(
-    "ssm",
-    endpoint_url=ENDPOINT,
-    region_name=REGION,
-    aws_access_key_id="test",
-    aws_secret_access_key="test"
-)
-
-try:
-    TABLE_NAME = ssm.get_parameter(Name="/app/tables/reviews")["Parameter"]["Value"]
-except Exception as e:
-    print("Error fetching table name from SSM:", e)
-    raise
-
-# Set up AWS resources for DynamoDB and S3, using LocalStack endpoints.
-ddb = boto3.resource(
-    "dynamodb",
-    endpoint_url=ENDPOINT,
-    region_name=REGION,
-    aws_access_key_id="test",
-    aws_secret_access_key="test"
-)
-
-table = ddb.Table(TABLE_NAME)
-
-# Establish s3 connection
-s3 = boto3.client(
-    "s3",
-    endpoint_url=ENDPOINT,
-    region_name=REGION,
-    aws_access_key_id="test",
-    aws_secret_access_key="test"
-)
+from urllib.parse import unquote_plus
+from config import EAGER_INIT, client, table
+from ingest_ops import count_reviews, get_checkpoint, is_jsonl, open_body, save_checkpoint, stream_lines
+from review_ops import get_source_versions, put_new_reviews, put_revised_review, source_version
+from text_ops import lemma_stats, preprocess, preprocess_batch
 
-def handler(event: dict, context) -> dict:
+
+# S3 client shared by all invocations of this container
+s3 = client("s3")
+
+# Objects downloaded concurrently per invocation (boto3 clients are thread-safe)
+S3_FETCH_WORKERS = int(os.getenv("S3_FETCH_WORKERS", "8"))
+_fetch_pool = ThreadPoolExecutor(max_workers=S3_FETCH_WORKERS)
+
+# JSON Lines objects are processed and checkpointed in chunks of this many lines
+BULK_CHUNK_LINES = int(os.getenv("BULK_CHUNK_LINES", "500"))
+# Milliseconds kept in reserve (on top of two chunks) before handing a
+# JSON Lines object over to a new invocation
+BULK_TIME_MARGIN_MS = int(os.getenv("BULK_TIME_MARGIN_MS", "1000"))
+
+if EAGER_INIT:
+    preprocess("", "warm up")
+
+
+# ──────────────────────────────────────────────────────────────
+# Record processing
+# ──────────────────────────────────────────────────────────────
+def _object_key(record: dict) -> str:
+    # Keys arrive URL-encoded in S3 events ("my review.json" -> "my+review.json")
+    return unquote_plus(record["s3"]["object"]["key"])
+
+
+def _fetch_review(record: dict) -> tuple:
     """
-    Lambda entrypoint for review preprocessing.
-    Reads a review from S3, parses the JSON,
-    and writes a stub item to DynamoDB.
+    Reads and parses the review object of a single S3 event record.
+    Returns (key, review, version, error); either review and its
+    source version or error are set.
+    """
+    bucket = record["s3"]["bucket"]["name"]
+    key = _object_key(record)
+    try:
+        response = s3.get_object(Bucket=bucket, Key=key)
+        # gzip/zstd objects are decompressed while reading
+        content = open_body(response, key).read()
+        # Parse review content as JSON.
+        review = json.loads(content.decode("utf-8"), parse_float=Decimal)
+        return key, review, source_version(bucket, key, response["ETag"]), None
+    except Exception as e:
+        return key, None, None, e
+
+
+def _store_reviews(reviews: list) -> None:
+    """
+    Preprocesses and writes a batch of (reviewId, review) pairs.
+    """
+    # Preprocess the texts of all reviews, combine and save
+    preprocessed = preprocess_batch([(review.get("summary"), review.get("reviewText")) for _, review in reviews])
+
+    # Write items to DynamoDB; the batch writer sends 25 puts per request
+    # and resends unprocessed items
+    with table("/app/tables/reviews").batch_writer(overwrite_by_pkeys=["reviewId"]) as batch:
+        for (review_id, review), content in zip(reviews, preprocessed):
+            batch.put_item(Item={
+                "reviewId": review_id,
+                "reviewerId": review.get("reviewerID"),
+                "content": content,
+                "overall": review.get("overall")
+            })
+
+
+def _store_objects(objects: list) -> tuple:
+    """
+    Stores the reviews of single-review objects, given as
+    (reviewId, review, version), at most once per object version
+    (bucket/key/ETag), so redelivered events are harmless. Versions that
+    are stored already are skipped before preprocessing; the new reviews
+    of a reviewer are written together with one reviewCount increment in
+    a transaction, and an overwritten object only replaces its item.
+    Returns (stored, duplicates).
     """
-    print("PREPROCESS STUB EVENT:", event)
+    # Deliveries repeated within the event are duplicates as well
+    unique = list({version: (review_id, review, version) for review_id, review, version in objects}.values())
+    duplicates = len(objects) - len(unique)
+
+    stored_versions = get_source_versions([review_id for review_id, _, _ in unique])
+    pending = []
+    for review_id, review, version in unique:
+        if stored_versions.get(review_id) == version:
+            duplicates += 1
+        else:
+            pending.append((review_id, review, version))
+
+    preprocessed = preprocess_batch([(review.get("summary"), review.get("reviewText")) for _, review, _ in pending])
+
+    new_reviews, revised = {}, []
+    for (review_id, review, version), content in zip(pending, preprocessed):
+        item = {
+            "reviewId": review_id,
+            "reviewerId": review.get("reviewerID"),
+            "content": content,
+            "overall": review.get("overall"),
+            "sourceVersion": version
+        }
+        if review_id in stored_versions:
+            revised.append(item)
+        else:
+            new_reviews.setdefault(item["reviewerId"], []).append(item)
+
+    # Conditional writes run concurrently; the new reviews of a reviewer
+    # share one transaction, so its users row is updated once. A False
+    # result lost the race against a concurrent delivery of the same version
+    futures = [_fetch_pool.submit(put_new_reviews, items) for items in new_reviews.values()]
+    written = list(_fetch_pool.map(put_revised_review, revised))
+    for future in futures:
+        written += future.result()
+    return sum(written), duplicates + written.count(False)
+
+
+def _continue_later(record: dict, context) -> None:
+    """
+    Hands a partly ingested object over to a new asynchronous invocation,
+    which resumes from the checkpoint.
+    """
+    client("lambda").invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType="Event",
+        Payload=json.dumps({"Records": [record]}).encode("utf-8")
+    )
+
 
-    # Read review object from S3.
-    record = event["Records"][0]
+def _ingest_jsonl(record: dict, context) -> int:
+    """
+    Streams a JSON Lines object and stores its reviews in chunks of
+    BULK_CHUNK_LINES lines, checkpointing after every chunk. Review ids are
+    "<key>#<line number>", so a chunk that is repeated overwrites its items;
+    the reviewCount increments are tracked on the checkpoint and never
+    repeated.
+    Returns the number of reviews stored by this invocation.
+    """
     bucket = record["s3"]["bucket"]["name"]
-    key = record["s3"]["object"]["key"]
-
-    response = s3.get_object(Bucket=bucket, Key=key)
-    content = response["Body"].read()
-
-    # Parse review content as JSON.
-    json_content = json.loads(content.decode("utf-8"), parse_float=Decimal)
-
-    # Extract reviewerId and register the review
-    reviewer_id = json_content.get("reviewerID")
-    register_review(reviewer_id)
-
-
-    # Preprocessing code 
-
-    # Extract the relevant parts 
-    reviewText = json_content.get("reviewText")
-    summary = json_content.get("summary")
-    overall = json_content.get("overall")
-
-
-    def preprocess(summary: str, review_text: str) -> str:
-        """
-        Combine summary + reviewText, then:
-        1) lower-case & tokenise
-        2) keep alphabetic tokens only
-        3) remove English stop-words
-        4) lemmatise (WordNet)
-        Returns a single space-separated string.
-        """
-        raw = f"{summary} {review_text}".lower()
-        tokens = word_tokenize(raw)                 # step 1
-        tokens = [t for t in tokens if ALPHA_RE.fullmatch(t)]        # step 2
-        tokens = [t for t in tokens if t not in STOP_WORDS]          # step 3
-        lemmas = [LEMMATISER.lemmatize(t) for t in tokens]           # step 4
-        return " ".join(lemmas)
-    
-    # Preprocess the texts, combine and save
-    preprocessed = preprocess(summary, reviewText)
-
-
-    # Write item to DynamoDB.
-    item = {
-        "reviewId": key,
-        "reviewerId": reviewer_id,
-        "content": preprocessed,
-        "overall": overall
-    }
-    table.put_item(Item=item)
-    
-
-
-    return {"status": "ok"}
+    key = _object_key(record)
+    etag = record["s3"]["object"].get("eTag") or s3.head_object(Bucket=bucket, Key=key)["ETag"].strip('"')
+
+    checkpoint = get_checkpoint(bucket, key, etag)
+    if checkpoint["done"]:
+        print(f"[preprocess] {key} already ingested, skipping")
+        return 0
+    lines_done, bytes_done, counted = checkpoint["linesDone"], checkpoint["bytesDone"], checkpoint["countedLines"]
+    if lines_done:
+        print(f"[preprocess] resuming {key} at line {lines_done}")
+
+    stored = 0
+    slowest_chunk_ms = 0.0
+    lines = stream_lines(bucket, key, checkpoint)
+    while True:
+        # Leave the rest to a new invocation instead of running into the timeout
+        if context is not None and context.get_remaining_time_in_millis() < BULK_TIME_MARGIN_MS + 2 * slowest_chunk_ms:
+            print(f"[preprocess] {key}: stopping at line {lines_done}, continuing in a new invocation")
+            _continue_later(record, context)
+            return stored
+
+        started = time.monotonic()
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == BULK_CHUNK_LINES:
+                break
+        if not chunk:
+            break
+
+        reviews, reviewers = [], []
+        for number, line in enumerate(chunk, start=lines_done):
+            if not line.strip():
+                continue
+            try:
+                review = json.loads(line.decode("utf-8"), parse_float=Decimal)
+            except ValueError as e:
+                print(f"ERROR parsing {key} line {number}:", e)
+                continue
+            reviews.append((f"{key}#{number}", review))
+            reviewers.append((number, review.get("reviewerID")))
+
+        # Register the reviews first; the lines an interrupted attempt
+        # counted already are skipped
+        if not count_reviews(bucket, key, etag, max(counted, lines_done), lines_done + len(chunk), reviewers):
+            print(f"[preprocess] {key}: another invocation is counting line {lines_done} onwards, stopping")
+            return stored
+        counted = max(counted, lines_done + len(chunk))
+        _store_reviews(reviews)
+        stored += len(reviews)
+
+        lines_done += len(chunk)
+        bytes_done += sum(len(line) for line in chunk)
+        if not save_checkpoint(bucket, key, etag, lines_done, bytes_done):
+            print(f"[preprocess] {key}: another invocation is further ahead, stopping at line {lines_done}")
+            return stored
+        slowest_chunk_ms = max(slowest_chunk_ms, (time.monotonic() - started) * 1000)
+
+    save_checkpoint(bucket, key, etag, lines_done, bytes_done, done=True)
+    print(f"[preprocess] {key}: ingested {lines_done} line(s)")
+    return stored
+
+
+# ──────────────────────────────────────────────────────────────
+# Lambda entrypoint
+# ──────────────────────────────────────────────────────────────
+def handler(event: dict, context) -> dict:
+    """
+    Lambda entrypoint for review preprocessing.
+    Reads every review of the S3 event concurrently, skips objects that
+    were stored before, and preprocesses the rest as one batch.
+    JSON Lines objects (.jsonl, optionally .gz/.zst) are ingested line by line.
+    """
+    print("PREPROCESS EVENT:", event)
+    records = event.get("Records", [])
+    stats_before = lemma_stats()
+
+    # Read all single-review objects from S3 at once
+    objects = []
+    failed_keys = []
+    single_records = [record for record in records if not is_jsonl(_object_key(record))]
+    for key, review, version, error in _fetch_pool.map(_fetch_review, single_records):
+        if error is not None:
+            print(f"ERROR reading review {key}:", error)
+            failed_keys.append(key)
+        else:
+            objects.append((key, review, version))
+    processed, duplicates = _store_objects(objects)
+    if duplicates:
+        print(f"[preprocess] skipped {duplicates} duplicate delivery(ies)")
+
+    for record in records:
+        if is_jsonl(_object_key(record)):
+            processed += _ingest_jsonl(record, context)
+
+    # Lemma lookups of this invocation; cache_size is the current size
+    stats = lemma_stats()
+    print("[preprocess] lemma", {
+        name: value if name == "cache_size" else value - stats_before[name]
+        for name, value in stats.items()
+    })
+
+    if failed_keys:
+        # Fail the invocation, so Lambda retries the event
+        raise RuntimeError(f"{len(failed_keys)} of {len(records)} review(s) could not be read: {failed_keys}")
+
+    return {"status": "ok", "processed": processed, "duplicates": duplicates}
@@ -0,0 +1,209 @@
+import gzip
+from collections import Counter
+from decimal import Decimal
+from config import client, table
+from review_ops import transact_write
+from user_ops import register_review_item
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compression by object suffix; a Content-Encoding header takes precedence
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
+# Objects with this suffix (before any compression suffix) hold one review per line
+JSONL_SUFFIX = ".jsonl"
+
+# Bytes requested from the S3 body per read
+READ_SIZE = 64 * 1024
+
+# A transaction holds at most 100 items: the checkpoint and 99 reviewers
+TRANSACT_REVIEWERS = 99
+
+# ──────────────────────────────────────────────────────────────
+# Internal helpers
+# ──────────────────────────────────────────────────────────────
+def _checkpoint_table():
+    return table("/app/tables/checkpoints")
+
+def _object_id(bucket: str, key: str) -> str:
+    return f"{bucket}/{key}"
+
+def _strip_compression_suffix(key: str) -> str:
+    for suffix in COMPRESSION_SUFFIXES:
+        if key.endswith(suffix):
+            return key[: -len(suffix)]
+    return key
+
+def _iter_lines(stream):
+    """
+    Yields the lines of a binary stream including their line break,
+    reading READ_SIZE bytes at a time.
+    """
+    pending = b""
+    while True:
+        block = stream.read(READ_SIZE)
+        if not block:
+            break
+        pending += block
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + b"\n"
+    if pending:
+        yield pending
+
+def _counted_update(bucket: str, key: str, etag: str, start: int, end: int) -> dict:
+    """
+    Transaction item moving countedLines of the checkpoint from start to
+    end; it fails if the lines before start are not exactly the counted ones.
+    """
+    # Checkpoints written before countedLines existed counted every line done
+    condition = "etag = :e AND (countedLines = :s OR (attribute_not_exists(countedLines) AND linesDone = :s))"
+    update = "SET countedLines = :c"
+    values = {":e": etag, ":s": Decimal(start), ":c": Decimal(end)}
+    if start == 0:
+        # The first lines of an object version start its checkpoint afresh
+        condition = f"attribute_not_exists(objectId) OR etag <> :e OR ({condition})"
+        update = "SET etag = :e, countedLines = :c, linesDone = :z, bytesDone = :z, done = :f"
+        values.update({":z": Decimal(0), ":f": False})
+    return {"Update": {
+        "TableName": _checkpoint_table().name,
+        "Key": {"objectId": _object_id(bucket, key)},
+        "UpdateExpression": update,
+        "ConditionExpression": condition,
+        "ExpressionAttributeValues": values
+    }}
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+def is_jsonl(key: str) -> bool:
+    return _strip_compression_suffix(key).endswith(JSONL_SUFFIX)
+
+def compression(key: str, content_encoding: str | None = None) -> str | None:
+    """
+    "gzip", "zstd" or None, from the Content-Encoding of the object
+    or, if that is not a compression, from the suffix of its key.
+    """
+    encoding = (content_encoding or "").strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return "gzip"
+    if encoding in ("zstd", "zst"):
+        return "zstd"
+    for suffix, name in COMPRESSION_SUFFIXES.items():
+        if key.endswith(suffix):
+            return name
+    return None
+
+def open_body(response: dict, key: str):
+    """
+    Wraps the streaming body of a get_object response in a decompressing
+    reader, so compressed objects are decoded incrementally while read.
+    """
+    body = response["Body"]
+    codec = compression(key, response.get("ContentEncoding"))
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=body)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"{key} is zstd-compressed, but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(body)
+    return body
+
+def get_checkpoint(bucket: str, key: str, etag: str) -> dict:
+    """
+    Progress of an earlier invocation on this version of the object:
+    {"linesDone", "bytesDone", "countedLines", "done"}. bytesDone counts
+    uncompressed bytes; countedLines is the number of lines whose reviews
+    were registered, which may be ahead of linesDone.
+    """
+    item = _checkpoint_table().get_item(
+        Key={"objectId": _object_id(bucket, key)},
+        ConsistentRead=True
+    ).get("Item")
+    if item is None or item.get("etag") != etag:
+        return {"linesDone": 0, "bytesDone": 0, "countedLines": 0, "done": False}
+    return {
+        "linesDone": int(item["linesDone"]),
+        "bytesDone": int(item["bytesDone"]),
+        "countedLines": int(item.get("countedLines", item["linesDone"])),
+        "done": item["done"]
+    }
+
+def save_checkpoint(bucket: str, key: str, etag: str, lines_done: int, bytes_done: int, done: bool = False) -> bool:
+    """
+    Records the progress on an object. The checkpoint only moves forward;
+    returns False if another invocation is already further along.
+    """
+    tbl = _checkpoint_table()
+    try:
+        tbl.update_item(
+            Key={"objectId": _object_id(bucket, key)},
+            UpdateExpression="SET etag = :e, linesDone = :l, bytesDone = :b, done = :d",
+            ConditionExpression="attribute_not_exists(objectId) OR etag <> :e OR linesDone <= :l",
+            ExpressionAttributeValues={
+                ":e": etag,
+                ":l": Decimal(lines_done),
+                ":b": Decimal(bytes_done),
+                ":d": done
+            }
+        )
+    except tbl.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
+    return True
+
+def count_reviews(bucket: str, key: str, etag: str, counted: int, end: int, reviewers: list) -> bool:
+    """
+    Increments the reviewCount of the reviewers of the lines from counted
+    up to end, given as (line number, reviewerId) pairs, exactly once per
+    object version: every transaction of up to TRANSACT_REVIEWERS reviewers
+    also moves countedLines of the checkpoint, on condition that it is
+    still where this invocation left it. A chunk repeated after a timeout
+    passes the countedLines of its checkpoint, so nothing is counted twice.
+    Returns False if another invocation is counting the object.
+    """
+    groups = []
+    start, counts = counted, Counter()
+    for number, reviewer_id in reviewers:
+        if number < counted:
+            continue
+        if reviewer_id not in counts and len(counts) == TRANSACT_REVIEWERS:
+            groups.append((start, number, counts))
+            start, counts = number, Counter()
+        counts[reviewer_id] += 1
+    if start < end:
+        groups.append((start, end, counts))
+
+    for start, stop, counts in groups:
+        items = [_counted_update(bucket, key, etag, start, stop)]
+        items += [register_review_item(reviewer_id, count) for reviewer_id, count in counts.items()]
+        if not transact_write(items):
+            return False
+    return True
+
+def stream_lines(bucket: str, key: str, checkpoint: dict):
+    """
+    Yields the lines of a JSON Lines object after the checkpoint, streamed
+    from S3 without loading the object. Uncompressed objects are resumed
+    with a ranged read; compressed objects are decompressed from the start
+    and the lines already done are skipped.
+    """
+    s3 = client("s3")
+    if checkpoint["bytesDone"]:
+        head = s3.head_object(Bucket=bucket, Key=key)
+        # Byte offsets only make sense in uncompressed objects
+        if compression(key, head.get("ContentEncoding")) is None:
+            if checkpoint["bytesDone"] >= head["ContentLength"]:
+                return
+            response = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={checkpoint['bytesDone']}-")
+            yield from _iter_lines(response["Body"])
+            return
+
+    lines = _iter_lines(open_body(s3.get_object(Bucket=bucket, Key=key), key))
+    for _ in range(checkpoint["linesDone"]):
+        if next(lines, None) is None:
+            return
+    yield from lines
@@ -0,0 +1,139 @@
+import marshal
+import pathlib
+
+# Compiled WordNet morphology, written by compile_morphology()
+ROOT = pathlib.Path(__file__).parent
+MORPHOLOGY_FILE = ROOT / "wordnet_morphy.marshal"
+MORPHOLOGY_VERSION = 1
+
+# WordNet file suffix per part of speech (satellite adjectives share "adj")
+POS_FILES = {"n": "noun", "v": "verb", "a": "adj", "r": "adv"}
+
+# Suffix rules of WordNet's morphy, as in nltk.corpus.reader.wordnet
+SUBSTITUTIONS = {
+    "n": [
+        ("s", ""),
+        ("ses", "s"),
+        ("ves", "f"),
+        ("xes", "x"),
+        ("zes", "z"),
+        ("ches", "ch"),
+        ("shes", "sh"),
+        ("men", "man"),
+        ("ies", "y"),
+    ],
+    "v": [
+        ("s", ""),
+        ("ies", "y"),
+        ("es", "e"),
+        ("es", ""),
+        ("ed", "e"),
+        ("ed", ""),
+        ("ing", "e"),
+        ("ing", ""),
+    ],
+    "a": [("er", ""), ("est", ""), ("er", "e"), ("est", "e")],
+    "r": [],
+}
+SUBSTITUTIONS["s"] = SUBSTITUTIONS["a"]
+
+
+# ──────────────────────────────────────────────────────────────
+# Packaging step
+# ──────────────────────────────────────────────────────────────
+def compile_morphology(open_file, output_path: pathlib.Path = MORPHOLOGY_FILE) -> pathlib.Path:
+    """
+    Reads the per-POS index and exception files of WordNet and writes the
+    lemmas and exceptions to output_path. open_file(name) has to return
+    the text of a WordNet file, e.g. "index.noun", as an iterable of lines.
+    Only the lemma column of the index files is kept.
+    """
+    index = {}
+    exceptions = {}
+    for pos, suffix in POS_FILES.items():
+        with open_file(f"index.{suffix}") as fh:
+            lemmas = sorted({ln.split(" ", 1)[0] for ln in fh if not ln.startswith(" ")})
+        # One newline-separated string per POS loads much faster than a set
+        index[pos] = "\n".join(lemmas)
+        with open_file(f"{suffix}.exc") as fh:
+            exceptions[pos] = {terms[0]: terms[1:] for terms in map(str.split, fh) if terms}
+
+    with open(output_path, "wb") as fh:
+        marshal.dump((MORPHOLOGY_VERSION, index, exceptions), fh)
+    return output_path
+
+
+# ──────────────────────────────────────────────────────────────
+# Lemmatiser
+# ──────────────────────────────────────────────────────────────
+class MorphyLemmatiser:
+    """
+    Drop-in replacement for nltk's WordNetLemmatizer that runs WordNet's
+    morphy on the compiled morphology file instead of the WordNet corpus.
+    The lemma set of a POS is built on its first use.
+    """
+
+    def __init__(self, index: dict, exceptions: dict):
+        self._index_text = index
+        self._index = {}
+        self._exceptions = {**exceptions, "s": exceptions["a"]}
+
+    @classmethod
+    def load(cls, path: pathlib.Path = MORPHOLOGY_FILE) -> "MorphyLemmatiser | None":
+        """
+        Reads a file written by compile_morphology(), or returns None
+        if there is no usable compiled file.
+        """
+        try:
+            with open(path, "rb") as fh:
+                version, index, exceptions = marshal.loads(fh.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != MORPHOLOGY_VERSION:
+            return None
+        return cls(index, exceptions)
+
+    def _lemmas(self, pos: str) -> set:
+        lemmas = self._index.get(pos)
+        if lemmas is None:
+            # Satellite adjectives are listed in the adjective index
+            lemmas = set(self._index_text["a" if pos == "s" else pos].split("\n"))
+            self._index[pos] = lemmas
+        return lemmas
+
+    def morphy(self, form: str, pos: str) -> list:
+        """All lemmas of form in WordNet, in the order nltk's _morphy returns them."""
+        lemmas = self._lemmas(pos)
+        substitutions = SUBSTITUTIONS[pos]
+
+        def apply_rules(forms):
+            return [
+                form[: -len(old)] + new
+                for form in forms
+                for old, new in substitutions
+                if form.endswith(old)
+            ]
+
+        def filter_forms(forms):
+            return list(dict.fromkeys(form for form in forms if form in lemmas))
+
+        exceptions = self._exceptions[pos]
+        if form in exceptions:
+            return filter_forms([form] + exceptions[form])
+
+        forms = apply_rules([form])
+        results = filter_forms([form] + forms)
+        if results:
+            return results
+
+        while forms:
+            forms = apply_rules(forms)
+            results = filter_forms(forms)
+            if results:
+                return results
+        return []
+
+    def lemmatize(self, word: str, pos: str = "n") -> str:
+        """Shortest lemma of word, or the word itself if WordNet does not know it."""
+        lemmas = self.morphy(word, pos)
+        return min(lemmas, key=len) if lemmas else word
@@ -0,0 +1,133 @@
+import random
+import time
+from config import client, table
+from user_ops import register_review_item
+
+# BatchGetItem accepts at most 100 keys per call
+BATCH_GET_SIZE = 100
+# A transaction holds at most 100 items: the reviewer's increment and 99 reviews
+TRANSACT_REVIEWS = 99
+# Attempts of a transaction cancelled by concurrent writes to its items,
+# e.g. two reviews of one reviewer bumping the same users row
+TRANSACT_ATTEMPTS = 6
+# Cancellation reasons that are worth another attempt
+RETRYABLE_CANCELLATIONS = ("TransactionConflict", "ThrottlingError", "ProvisionedThroughputExceeded")
+
+# ──────────────────────────────────────────────────────────────
+# Internal helpers
+# ──────────────────────────────────────────────────────────────
+def _table():
+    return table("/app/tables/reviews")
+
+def _transact(items: list) -> list:
+    """
+    Runs a TransactWriteItems request and returns the indices of the items
+    whose condition failed, writing nothing; an empty list once written.
+    Transactions cancelled by conflicting writes or throttling are retried
+    with jittered exponential backoff; any other cancellation, or the last
+    failed attempt, is raised.
+    """
+    ddb = client("dynamodb")
+    for attempt in range(TRANSACT_ATTEMPTS):
+        try:
+            ddb.transact_write_items(TransactItems=items)
+            return []
+        except ddb.exceptions.TransactionCanceledException as e:
+            codes = [reason.get("Code") for reason in e.response.get("CancellationReasons", [])]
+            if "ConditionalCheckFailed" in codes:
+                return [index for index, code in enumerate(codes) if code == "ConditionalCheckFailed"]
+            if attempt == TRANSACT_ATTEMPTS - 1 or not any(code in RETRYABLE_CANCELLATIONS for code in codes):
+                raise
+        time.sleep(random.uniform(0, min(0.05 * 2 ** attempt, 2.0)))
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+def source_version(bucket: str, key: str, etag: str) -> str:
+    """
+    Idempotency key of a review object: the same bucket/key/ETag is the
+    same delivery of the same content.
+    """
+    # ETags come quoted from S3 responses and unquoted in events
+    return f"{bucket}/{key}/" + etag.strip('"')
+
+def get_source_versions(review_ids: list) -> dict:
+    """
+    {reviewId: sourceVersion} of the reviews already stored, with batched
+    strongly consistent reads of only these two attributes. Items written
+    before versions were recorded map to "".
+    """
+    table_name = _table().name
+    ddb = client("dynamodb")
+    versions = {}
+    review_ids = list(dict.fromkeys(review_ids))
+    for start in range(0, len(review_ids), BATCH_GET_SIZE):
+        request = {table_name: {
+            "Keys": [{"reviewId": review_id} for review_id in review_ids[start:start + BATCH_GET_SIZE]],
+            "ProjectionExpression": "reviewId, sourceVersion",
+            "ConsistentRead": True
+        }}
+        while request:
+            response = ddb.batch_get_item(RequestItems=request)
+            for item in response["Responses"].get(table_name, []):
+                versions[item["reviewId"]] = item.get("sourceVersion", "")
+            request = response.get("UnprocessedKeys") or {}
+    return versions
+
+def transact_write(items: list) -> bool:
+    """
+    Runs a TransactWriteItems request, retrying conflicts like _transact.
+    Returns False, writing nothing, if a condition of the items failed.
+    """
+    return not _transact(items)
+
+def put_new_reviews(items: list) -> list:
+    """
+    Writes reviews of one reviewer that are not stored yet, in transactions
+    of up to TRANSACT_REVIEWS conditional puts and a single reviewCount
+    increment for all of them, so the users row is updated once per
+    transaction. A review that exists already (a concurrent duplicate
+    delivery) is left out and the rest is written again without it.
+    Returns for every item whether it was written.
+    """
+    table_name = _table().name
+    written = [False] * len(items)
+    # A transaction may touch every reviewId only once
+    first = {}
+    for index, item in enumerate(items):
+        first.setdefault(item["reviewId"], index)
+    indices = list(first.values())
+
+    for start in range(0, len(indices), TRANSACT_REVIEWS):
+        pending = indices[start:start + TRANSACT_REVIEWS]
+        while pending:
+            failed = _transact([
+                *({"Put": {
+                    "TableName": table_name,
+                    "Item": items[index],
+                    "ConditionExpression": "attribute_not_exists(reviewId)"
+                }} for index in pending),
+                register_review_item(items[pending[0]]["reviewerId"], len(pending))
+            ])
+            if not failed:
+                for index in pending:
+                    written[index] = True
+                break
+            pending = [index for position, index in enumerate(pending) if position not in failed]
+    return written
+
+def put_revised_review(item: dict) -> bool:
+    """
+    Replaces a stored review with a new version of its object, without
+    counting it again. Returns False if this version is stored already.
+    """
+    tbl = _table()
+    try:
+        tbl.put_item(
+            Item=item,
+            ConditionExpression="attribute_not_exists(sourceVersion) OR sourceVersion <> :v",
+            ExpressionAttributeValues={":v": item["sourceVersion"]}
+        )
+    except tbl.meta.client.exceptions.ConditionalCheckFailedException:
+        return False
+    return True
@@ -0,0 +1,194 @@
+import os
+import re
+import pathlib
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+from morphy import MorphyLemmatiser
+
+# Find folder 'nltk_data' via relative path
+ROOT = pathlib.Path(__file__).parent
+NLTK_DATA = ROOT / "nltk_data"
+STOP_FILE = ROOT / "stopwords.txt"
+# Optional precomputed lemmas of the most frequent review words,
+# written by scripts/build_lemma_table.py
+LEMMA_TABLE_FILE = ROOT / "lemma_table.tsv"
+
+if not STOP_FILE.exists():
+    raise FileNotFoundError(f"stopwords file not found: {STOP_FILE}")
+
+# Read in the given stopwords.txt
+with STOP_FILE.open(encoding="utf-8") as fh:
+    STOP_WORDS = {
+        ln.strip().lower()
+        for ln in fh
+        if ln.strip() and not ln.lstrip().startswith("#")
+    }
+
+
+ALPHA_RE = re.compile(r"[A-Za-z]+")
+# Characters that glue two runs of letters into one non-alphabetic token
+# for the Treebank tokenizer ("well-made", "a/b", "mp3"), which nltk drops
+_GLUE = r"[\w'/|*+=^~-]"
+
+# Alphabetic words as word_tokenize would return them, in one findall pass
+WORD_RE = re.compile(rf"""
+    (?<!{_GLUE})(?<!\w\.)                       # not inside a compound or abbreviation
+    [a-z]+
+    (?=
+        n't(?!{_GLUE})                           # "don't" -> do, Treebank splits off "n't"
+      | '(?:s|m|d|ll|re|ve)?(?!{_GLUE})          # clitics and closing quotes are split off
+      | (?!{_GLUE})(?!\.\w)(?![:,]\d)             # otherwise the word has to end here
+    )
+""", re.VERBOSE)
+
+# Tokenizer used by preprocess():
+#   regex – alphabetic words extracted with WORD_RE, no NLTK or Punkt needed
+#   nltk  – word_tokenize (Punkt + Treebank), keeping only alphabetic tokens
+TOKENIZER_MODES = ("regex", "nltk")
+TOKENIZER_MODE = os.getenv("TOKENIZER_MODE", "regex").lower()
+
+if TOKENIZER_MODE not in TOKENIZER_MODES:
+    raise ValueError(f"TOKENIZER_MODE must be one of {TOKENIZER_MODES}, got {TOKENIZER_MODE!r}")
+
+# Words whose lemma is kept in the warm container (least recently used are evicted)
+LEMMA_CACHE_SIZE = int(os.getenv("LEMMA_CACHE_SIZE", "20000"))
+
+
+# ──────────────────────────────────────────────────────────────
+# Internal helpers
+# ──────────────────────────────────────────────────────────────
+def _load_lemma_table(path: pathlib.Path) -> dict:
+    """
+    Reads the word -> lemma pairs of a lemma table (one tab-separated
+    pair per line), or returns an empty table if there is none.
+    """
+    if not path.exists():
+        return {}
+    table = {}
+    with path.open(encoding="utf-8") as fh:
+        for ln in fh:
+            if ln.startswith("#") or not ln.strip():
+                continue
+            word, lemma = ln.rstrip("\n").split("\t")
+            table[word] = lemma
+    return table
+
+
+@lru_cache(maxsize=1)
+def _nltk():
+    """
+    Imports NLTK on first use. Its package __init__ pulls in most of the
+    library, so this keeps it out of the import phase of the container.
+    """
+    import nltk
+
+    # If it exists -> add to the nltk paths
+    if NLTK_DATA.exists():
+        nltk.data.path.append(str(NLTK_DATA))
+    return nltk
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def _cached_lemma(token: str) -> str:
+    return get_lemmatiser().lemmatize(token)
+
+
+# Loaded at startup, the most frequent words never reach WordNet
+LEMMA_TABLE = _load_lemma_table(LEMMA_TABLE_FILE)
+_lemma_table_hits = Counter()
+
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+@lru_cache(maxsize=1)
+def get_lemmatiser():
+    """
+    Returns the container-wide WordNet lemmatiser: morphy on the bundled
+    wordnet_morphy.marshal, or NLTK's WordNetLemmatizer if it is missing.
+    """
+    lemmatiser = MorphyLemmatiser.load()
+    if lemmatiser is None:
+        print("[preprocess] wordnet_morphy.marshal not found, falling back to NLTK WordNet")
+        return _nltk().WordNetLemmatizer()
+    return lemmatiser
+
+
+def lemmatize(token: str) -> str:
+    """
+    WordNet lemma of a token, looked up in the precomputed lemma table
+    first and in the container's LRU cache second.
+    """
+    lemma = LEMMA_TABLE.get(token)
+    if lemma is not None:
+        _lemma_table_hits["hits"] += 1
+        return lemma
+    return _cached_lemma(token)
+
+
+def lemma_stats() -> dict:
+    """
+    Lookup counters since the container started. Callers log the
+    difference between two snapshots to get per-invocation numbers.
+    """
+    info = _cached_lemma.cache_info()
+    return {
+        "table_hits": _lemma_table_hits["hits"],
+        "cache_hits": info.hits,
+        "cache_misses": info.misses,
+        "cache_size": info.currsize,
+    }
+
+
+def word_tokenize(text: str) -> list:
+    """NLTK's word_tokenize, imported on first use."""
+    return _nltk().word_tokenize(text)
+
+
+def tokenize(raw: str, mode: str = TOKENIZER_MODE) -> list:
+    """
+    Alphabetic tokens of an already lower-cased text.
+    The regex mode never loads NLTK or the Punkt models. It matches the
+    nltk mode on common review text: "n't" and the trailing clitics are
+    split off ("don't" -> do) and compounds are dropped ("well-made").
+    It does not apply the other Treebank contraction rules: "gonna" or
+    "cannot" stay one word, "'tis" or "d'ye" are dropped. It also keeps
+    abbreviations inside a sentence ("mr. smith"), a word whose full stop
+    is followed by more punctuation ("good.,") and words the nltk
+    mode loses to its sentence splitter or to a clitic at the end of a
+    line ("i. love", "it's\n"). The differences are pinned in
+    tests/test_preprocess_tokenizer.py.
+    """
+    if mode == "nltk":
+        return [t for t in word_tokenize(raw) if ALPHA_RE.fullmatch(t)]
+    return WORD_RE.findall(raw)
+
+
+def preprocess(summary: str, review_text: str) -> str:
+    """
+    Combine summary + reviewText, then:
+    1) lower-case & tokenise
+    2) keep alphabetic tokens only
+    3) remove English stop-words
+    4) lemmatise (WordNet, memoized)
+    Returns a single space-separated string.
+    """
+    raw = f"{summary} {review_text}".lower()
+    tokens = tokenize(raw)                                       # steps 1 + 2
+    tokens = [t for t in tokens if t not in STOP_WORDS]          # step 3
+    lemmas = [lemmatize(t) for t in tokens]                      # step 4
+    return " ".join(lemmas)
+
+
+def preprocess_batch(reviews: list) -> list:
+    """
+    preprocess() for a list of (summary, review_text) pairs.
+    Every distinct token of the batch is lemmatised only once.
+    """
+    token_lists = [
+        [t for t in tokenize(f"{summary} {review_text}".lower()) if t not in STOP_WORDS]
+        for summary, review_text in reviews
+    ]
+    lemmas = {t: lemmatize(t) for t in set(chain.from_iterable(token_lists))}
+    return [" ".join(lemmas[t] for t in tokens) for tokens in token_lists]
@@ -1,88 +1,143 @@
-import os
 import json
-import boto3
+from functools import lru_cache
+from itertools import groupby
+from config import EAGER_INIT, table
 from profanityfilter import ProfanityFilter
+from result_cache import ResultCache
+from stats_ops import add_stats
 from user_ops import register_profanity
 
 
-# ──────────────────────────────────────────────────────────────
-# AWS / LocalStack configuration
-# ──────────────────────────────────────────────────────────────
-host = os.getenv("LOCALSTACK_HOSTNAME", "localhost")
-port = os.getenv("EDGE_PORT", "4566")
-ENDPOINT = f"http://{host}:{port}"
-REGION   = os.getenv("AWS_REGION", "us-east-1")
-
-# Initialize SSM client and fetch the DynamoDB table name from Parameter Store.
-ssm = boto3.client(
-    "ssm",
-    endpoint_url=ENDPOINT,
-    region_name=REGION,
-    aws_access_key_id="test",
-    aws_secret_access_key="test"
-)
-
-REVIEWS_TABLE = ssm.get_parameter(Name="/app/tables/reviews")["Parameter"]["Value"]
-
+@lru_cache(maxsize=1)
+def get_profanity_filter() -> ProfanityFilter:
+    """
+    Initializes the profanity detector once per Lambda container,
+    on the first record that needs it.
+    """
+    return ProfanityFilter()
 
-# DynamoDB connection setup
-ddb = boto3.resource(
-    "dynamodb",
-    endpoint_url=ENDPOINT,
-    region_name=REGION,
-    aws_access_key_id="test",
-    aws_secret_access_key="test"
-)
-reviews_tbl = ddb.Table(REVIEWS_TABLE)
 
-# Initialize the profanity detector once per Lambda container.
-pf = ProfanityFilter()
+if EAGER_INIT:
+    get_profanity_filter()
 
+# Results by review content; bump the version when the word lists change
+profanity_cache = ResultCache("profanity:v1")
 
 
 # ──────────────────────────────────────────────────────────────
-# Lambda entrypoint
+# Record processing
 # ──────────────────────────────────────────────────────────────
-def handler(event: dict, context) -> dict:
+def _process_record(record: dict) -> str | None:
     """
-    Detects profanity in the incoming review and updates
+    Detects profanity in a single stream record and updates
     the isUnpolite flag in the reviews table.
+    Returns the reviewer to charge with the offence, if any.
     """
-    try:
-        # Extract the relevant information from the event
-        new_image = event['Records'][0]['dynamodb']['NewImage']
-                
-        review_id = new_image['reviewId']['S']
-                
-        review_text = new_image['content']['S']
+    # Extract the relevant information from the record
+    new_image = record['dynamodb']['NewImage']
 
-        reviewer_id = new_image['reviewerId']['S']
+    review_id = new_image['reviewId']['S']
 
-        event_name = event['Records'][0]['eventName']
-        
+    review_text = new_image['content']['S']
 
-        # Ignore MODIFY/REMOVE events
-        if event_name != "INSERT":
-            return {"status": "skipped"}
+    reviewer_id = new_image['reviewerId']['S']
 
-        # Execute profanity check for the review_text
-        is_unpolite = pf.is_profane(review_text)
-        print(f"[profanity_check] reviewId={review_id}  is_unpolite={is_unpolite}")
+    # Execute profanity check for the review_text, unless it was seen before
+    is_unpolite = profanity_cache.get(review_text)
+    if is_unpolite is None:
+        is_unpolite = get_profanity_filter().is_profane(review_text)
+        profanity_cache.put(review_text, is_unpolite)
+    print(f"[profanity_check] reviewId={review_id}  is_unpolite={is_unpolite}")
 
-        # Save the result in the DynamoDb
-        reviews_tbl.update_item(
-            Key={"reviewId": review_id},
-            UpdateExpression="SET isUnpolite = :u",
-            ExpressionAttributeValues={":u": is_unpolite}
-        )
+    # Save the result in the DynamoDb
+    table("/app/tables/reviews").update_item(
+        Key={"reviewId": review_id},
+        UpdateExpression="SET isUnpolite = :u",
+        ExpressionAttributeValues={":u": is_unpolite}
+    )
 
-        if is_unpolite:
-            register_profanity(reviewer_id, threshold=4)
+    return reviewer_id if is_unpolite else None
 
+
+# ──────────────────────────────────────────────────────────────
+# Lambda entrypoint
+# ──────────────────────────────────────────────────────────────
+def handler(event: dict, context) -> dict:
+    """
+    Processes every record of a DynamoDB Stream batch and reports
+    failed records as a partial batch response.
+    Consecutive offences of a reviewer are registered with one update,
+    in stream order, so a failed update is retried together with exactly
+    the offences after it and no offence is counted twice.
+    """
+    failed_sequence_number = None
+    # (sequence number, reviewer) of every profane review, in stream order
+    offences = []
+    # Offences registered in the users table, for the moderation statistics
+    profane_reviews = 0
+    banned_users = 0
+    # Records that are not INSERTs, to measure the traffic event filtering saves
+    skipped = 0
+
+    # Load the cached results of the whole batch at once
+    profanity_cache.prefetch([
+        record['dynamodb']['NewImage']['content']['S']
+        for record in event.get('Records', [])
+        if record.get('eventName') == "INSERT" and 'content' in record.get('dynamodb', {}).get('NewImage', {})
+    ])
+
+    for record in event.get('Records', []):
+        sequence_number = record['dynamodb']['SequenceNumber']
+        # The event source mapping only delivers INSERT records; emulators
+        # without event filtering still deliver MODIFY/REMOVE, skip those here
+        if record.get('eventName') != "INSERT":
+            skipped += 1
+            continue
+        try:
+            reviewer_id = _process_record(record)
+        except Exception as e:
+            print("ERROR in profanity_check handler")
+            print("Record:", json.dumps(record))
+            print("Exception:", e)
+            # Lambda retries the batch from the first reported record onwards,
+            # so stop here instead of processing the remaining records twice
+            failed_sequence_number = sequence_number
+            break
+        if reviewer_id is not None:
+            offences.append((sequence_number, reviewer_id))
+
+    profanity_cache.flush()
+    print("[profanity_check] result cache", profanity_cache.take_stats())
+    if skipped:
+        print(f"[profanity_check] skipped {skipped} of {len(event.get('Records', []))} record(s) (not INSERT)")
+
+    for reviewer_id, run in groupby(offences, key=lambda offence: offence[1]):
+        sequence_numbers = [sequence_number for sequence_number, _ in run]
+        try:
+            if register_profanity(reviewer_id, threshold=4, count=len(sequence_numbers)):
+                print(f"[profanity_check] reviewerId={reviewer_id}  banned")
+                banned_users += 1
+        except Exception as e:
+            print(f"ERROR registering {len(sequence_numbers)} offence(s) for {reviewer_id}")
+            print("Exception:", e)
+            # Lambda retries from this run onwards; every run registered so far
+            # comes before it, and no later one is registered
+            failed_sequence_number = sequence_numbers[0]
+            break
+        profane_reviews += len(sequence_numbers)
+
+    try:
+        add_stats({
+            "profaneReviews": profane_reviews,
+            "bannedUsers": banned_users,
+            "profanitySkippedRecords": skipped,
+            # Invocations for nothing but skipped records
+            "profanityIdleInvocations": int(skipped > 0 and skipped == len(event.get('Records', [])))
+        })
     except Exception as e:
-        print("ERROR in profanity_check handler")
-        print("Event:", json.dumps(event))
-        print("Exception:", e)
-        raise e
+        # The statistics are best effort; a retry would count the batch twice
+        print("ERROR updating moderation statistics:", e)
 
-    return {"status": "ok"}
+    if failed_sequence_number is None:
+        return {"batchItemFailures": []}
+    return {"batchItemFailures": [{"itemIdentifier": failed_sequence_number}]}
@@ -42,24 +42,64 @@ class ProfanityFilter:
         self._BASE_DIR = os.path.abspath(os.path.dirname(__file__))
         self._words_file = os.path.join(self._BASE_DIR, 'data', 'badwords.txt')
 
+        # Compiled matchers, rebuilt whenever the word lists change
+        self._word_regexes = []
+        self._profane_regex = None
+
         self._load_words()
 
     def _load_words(self):
         """Loads the list of profane words from file."""
         with open(self._words_file, 'r') as f:
             self._censor_list = [line.strip() for line in f.readlines()]
+        self._build_matchers()
+
+    def _build_matchers(self):
+        """
+        Compiles the current word lists into reusable matchers.
+
+        Builds one regex per word (applied in order by ``censor``) and a
+        single alternation of all of them, used by ``is_profane`` to decide
+        in one pass over the text.
+        """
+        word_regexes = []
+        regex_strings = []
+
+        for word in self.get_profane_words():
+            # An empty word matches everywhere but never changes the text
+            if not word:
+                continue
+            # Apply word boundaries to the bad word
+            regex_string = word
+            if not self._no_word_boundaries:
+                if STARTS_WITH_WORD_CHAR.search(word):
+                    regex_string = r'\b' + regex_string
+                if ENDS_WITH_WORD_CHAR.search(word):
+                    regex_string = regex_string + r'\b'
+            word_regexes.append((re.compile(regex_string, re.IGNORECASE),
+                                 len(RE_ESCAPED_CHAR.sub("\1", word))))
+            regex_strings.append(regex_string)
+
+        self._word_regexes = word_regexes
+        if regex_strings:
+            self._profane_regex = re.compile("|".join(regex_strings), re.IGNORECASE)
+        else:
+            self._profane_regex = None
 
     def define_words(self, word_list):
         """Define a custom list of profane words to be used instead of the default list."""
         self._custom_censor_list = word_list
+        self._build_matchers()
 
     def append_words(self, word_list):
         """Define a custom list of profane words to be used in conjunction with the default list."""
         self._extra_censor_list.extend(word_list)
+        self._build_matchers()
 
     def remove_word(self, word):
         """Remove given word from censor list."""
         self._censor_list.remove(word)
+        self._build_matchers()
 
     def set_censor(self, character):
         """Replaces the original censor character '*' with ``character``."""
@@ -70,7 +110,8 @@ class ProfanityFilter:
 
     def has_bad_word(self, text):
         """Returns True if text contains profanity, False otherwise."""
-        return self.censor(text) != text
+        # Stops at the first profane word instead of censoring the whole text
+        return self._profane_regex is not None and self._profane_regex.search(text) is not None
 
     def get_custom_censor_list(self):
         """Returns the list of custom profane words."""
@@ -109,19 +150,10 @@ class ProfanityFilter:
 
     def censor(self, input_text):
         """Returns input_text with any profane words censored."""
-        bad_words = self.get_profane_words()
         res = input_text
 
-        for word in bad_words:
-            # Apply word boundaries to the bad word
-            regex_string = word
-            if not self._no_word_boundaries:
-                if STARTS_WITH_WORD_CHAR.search(word):
-                    regex_string = r'\b' + regex_string
-                if ENDS_WITH_WORD_CHAR.search(word):
-                    regex_string = regex_string + r'\b'
-            regex = re.compile(regex_string, re.IGNORECASE)
-            res = regex.sub(self._censor_char * len(RE_ESCAPED_CHAR.sub("\1", word)), res)
+        for regex, length in self._word_regexes:
+            res = regex.sub(self._censor_char * length, res)
 
         return res
 
@@ -0,0 +1,43 @@
+from decimal import Decimal
+from config import table
+
+# Key of the single item that holds the running moderation statistics
+STATS_KEY = {"statId": "moderation"}
+
+# Attribute of the stats item per sentiment label
+SENTIMENT_ATTRIBUTES = {
+    "POSITIVE": "positiveReviews",
+    "NEGATIVE": "negativeReviews",
+    "NEUTRAL":  "neutralReviews",
+}
+
+# ──────────────────────────────────────────────────────────────
+# Internal helpers
+# ──────────────────────────────────────────────────────────────
+def _table():
+    return table("/app/tables/stats")
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+def add_stats(counts: dict) -> None:
+    """
+    Adds counts ({attribute: n}) to the stats item with one atomic ADD,
+    creating the item or attributes if absent. Zero counts are skipped.
+    """
+    counts = {name: n for name, n in counts.items() if n}
+    if not counts:
+        return
+    names = sorted(counts)
+    _table().update_item(
+        Key=STATS_KEY,
+        UpdateExpression="ADD " + ", ".join(f"#a{i} :n{i}" for i in range(len(names))),
+        ExpressionAttributeNames={f"#a{i}": name for i, name in enumerate(names)},
+        ExpressionAttributeValues={f":n{i}": Decimal(counts[name]) for i, name in enumerate(names)}
+    )
+
+def get_stats() -> dict | None:
+    """
+    Returns the stats item, or None if nothing was counted yet.
+    """
+    return _table().get_item(Key=STATS_KEY, ConsistentRead=True).get("Item")
@@ -1,64 +1,70 @@
-import os
-import boto3
 from decimal import Decimal
-from functools import lru_cache
+from config import table
 
 # ──────────────────────────────────────────────────────────────
 # Internal helpers
 # ──────────────────────────────────────────────────────────────
-def _endpoint() -> str:
-    host = os.getenv("LOCALSTACK_HOSTNAME", "localhost")
-    port = os.getenv("EDGE_PORT", "4566")
-    return f"http://{host}:{port}"
-
-@lru_cache(maxsize=1)
 def _table():
-    endpoint = _endpoint()
-    region   = os.getenv("AWS_REGION", "us-east-1")
-    ssm = boto3.client("ssm", endpoint_url=endpoint, region_name=region,
-                       aws_access_key_id="test", aws_secret_access_key="test")
-    users_table_name = ssm.get_parameter(Name="/app/tables/users")["Parameter"]["Value"]
-    ddb = boto3.resource("dynamodb", endpoint_url=endpoint, region_name=region,
-                         aws_access_key_id="test", aws_secret_access_key="test")
-    return ddb.Table(users_table_name)
+    return table("/app/tables/users")
 
-# ──────────────────────────────────────────────────────────────
-# Public API
-# ──────────────────────────────────────────────────────────────
-def register_review(reviewer_id: str) -> None:
-    """
-    Always increments reviewCount, creates row if absent.
-    """
-    tbl = _table()
-    tbl.update_item(
-        Key={"userId": reviewer_id},
-        UpdateExpression=(
-            "SET reviewCount   = if_not_exists(reviewCount, :z) + :one, "
-            "    unpoliteCount = if_not_exists(unpoliteCount, :z), "
+def _review_count_update(reviewer_id: str, count: int) -> dict:
+    return {
+        "Key": {"userId": reviewer_id},
+        "UpdateExpression": (
+            "ADD reviewCount :n "
+            "SET unpoliteCount = if_not_exists(unpoliteCount, :z), "
             "    banned        = if_not_exists(banned, :f)"
         ),
-        ExpressionAttributeValues={
+        "ExpressionAttributeValues": {
             ":z":    Decimal(0),
-            ":one":  Decimal(1),
+            ":n":    Decimal(count),
             ":f":    False
         }
-    )
+    }
 
-def register_profanity(reviewer_id: str, threshold: int = 3) -> None:
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+def register_review(reviewer_id: str, count: int = 1) -> None:
+    """
+    Always increments reviewCount by count, creates row if absent.
     """
-    Increments unpoliteCount and sets banned=True if threshold reached.
+    _table().update_item(**_review_count_update(reviewer_id, count))
+
+def register_review_item(reviewer_id: str, count: int = 1) -> dict:
+    """
+    The update of register_review as an item of a TransactWriteItems
+    request, so the count can be bumped together with another write.
+    """
+    return {"Update": {"TableName": _table().name, **_review_count_update(reviewer_id, count)}}
+
+def register_profanity(reviewer_id: str, threshold: int = 3, count: int = 1) -> bool:
+    """
+    Increments unpoliteCount by count and sets banned=True if threshold reached.
+    Returns True only for the call that banned the user.
+
+    The increment returns the new count in the same round-trip; the ban is
+    a conditional write on banned=False, so exactly one concurrent caller
+    flips it and only the review that crosses the threshold pays for it.
     """
     tbl = _table()
-    tbl.update_item(
+    updated = tbl.update_item(
         Key={"userId": reviewer_id},
-        UpdateExpression="ADD unpoliteCount :one",
-        ExpressionAttributeValues={":one": Decimal(1)}
-    )
-    # fetch current count to decide banning
-    user = tbl.get_item(Key={"userId": reviewer_id}).get("Item", {})
-    if user and user.get("unpoliteCount", 0) >= threshold and not user.get("banned", False):
+        UpdateExpression="ADD unpoliteCount :n SET banned = if_not_exists(banned, :f)",
+        ExpressionAttributeValues={":n": Decimal(count), ":f": False},
+        ReturnValues="UPDATED_NEW"
+    )["Attributes"]
+    if updated["unpoliteCount"] < threshold or updated["banned"]:
+        return False
+
+    try:
         tbl.update_item(
             Key={"userId": reviewer_id},
             UpdateExpression="SET banned = :t",
-            ExpressionAttributeValues={":t": True}
+            ConditionExpression="banned = :f AND unpoliteCount >= :threshold",
+            ExpressionAttributeValues={":t": True, ":f": False, ":threshold": Decimal(threshold)}
         )
+    except tbl.meta.client.exceptions.ConditionalCheckFailedException:
+        # Another invocation banned the user first
+        return False
+    return True
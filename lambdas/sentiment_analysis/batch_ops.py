@@ -0,0 +1,30 @@
+import time
+
+# BatchWriteItem accepts at most 25 put requests per call
+BATCH_WRITE_SIZE = 25
+# Attempts per chunk before giving up on UnprocessedItems
+BATCH_WRITE_ATTEMPTS = 6
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+def write_batch(ddb, table_name: str, items: list) -> None:
+    """
+    Writes up to BATCH_WRITE_SIZE items to table_name with one
+    BatchWriteItem call of the client ddb, retrying UnprocessedItems
+    (e.g. throttled puts) with exponential backoff. The items are passed
+    as they are, in the format ddb expects.
+    """
+    request_items = {table_name: [{'PutRequest': {'Item': item}} for item in items]}
+
+    for attempt in range(BATCH_WRITE_ATTEMPTS):
+        response = ddb.batch_write_item(RequestItems=request_items)
+        request_items = response.get('UnprocessedItems') or {}
+        if not request_items:
+            return
+        time.sleep(min(0.05 * 2 ** attempt, 2.0))
+
+    raise RuntimeError(
+        f"{len(request_items.get(table_name, []))} sentiment item(s) still unprocessed "
+        f"after {BATCH_WRITE_ATTEMPTS} attempts"
+    )
@@ -1,116 +1,200 @@
-import os
 import json
-import boto3
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+from functools import lru_cache
+from batch_ops import BATCH_WRITE_SIZE, write_batch
+from config import EAGER_INIT, client, get_parameter, table
+from result_cache import ResultCache
+from score_ops import classify, encode_scores
+from stats_ops import SENTIMENT_ATTRIBUTES, add_stats
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 
-# LocalStack endpoint and region (matches setup script)
-host = os.getenv("LOCALSTACK_HOSTNAME", "localhost")
-port = os.getenv("EDGE_PORT", "4566")
-ENDPOINT = f"http://{host}:{port}"
-REGION = os.getenv("AWS_REGION", "us-east-1")
+@lru_cache(maxsize=1)
+def get_analyzer() -> SentimentIntensityAnalyzer:
+    """
+    Initializes the Sentiment Analyzer from the vaderSentiment Package
+    once per Lambda container, on the first record that needs it.
+    """
+    return SentimentIntensityAnalyzer()
 
 
-# Initialize SSM client and fetch the DynamoDB table name from Parameter Store. 
-ssm = boto3.client(
-    "ssm",
-    endpoint_url=ENDPOINT,
-    region_name=REGION,
-    aws_access_key_id="test",
-    aws_secret_access_key="test"
-)
+if EAGER_INIT:
+    get_analyzer()
 
-TABLE_NAME = ssm.get_parameter(Name="/app/tables/sentiment")["Parameter"]["Value"]
+# VADER scores by review content; bump the version when the scoring changes
+sentiment_cache = ResultCache("sentiment:v1")
 
+# Where the results are stored:
+#   table   – sentiment table (reviewId, sentiment), the legacy layout
+#   reviews – sentiment and scores on the reviews row; the sparse
+#             sentiment-index of the reviews table makes them queryable
+#   both    – both layouts, while moving from one to the other
+SENTIMENT_STORAGES = ("table", "reviews", "both")
+SENTIMENT_STORAGE = os.getenv("SENTIMENT_STORAGE", "table").lower()
 
+if SENTIMENT_STORAGE not in SENTIMENT_STORAGES:
+    raise ValueError(f"SENTIMENT_STORAGE must be one of {SENTIMENT_STORAGES}, got {SENTIMENT_STORAGE!r}")
 
-# Initialize DynamoDB resource
-ddb = boto3.resource(
-    "dynamodb",
-    endpoint_url=ENDPOINT,
-    region_name=REGION,
-    aws_access_key_id="test",
-    aws_secret_access_key="test"
-)
-table = ddb.Table(TABLE_NAME)
+# Reviews rows updated concurrently per invocation, through the thread-safe
+# client behind the reviews Table
+REVIEW_UPDATE_WORKERS = int(os.getenv("REVIEW_UPDATE_WORKERS", "8"))
+_update_pool = ThreadPoolExecutor(max_workers=REVIEW_UPDATE_WORKERS)
 
-# Initialize the Sentiment Analyzer from the vaderSentiment Package
-analyzer = SentimentIntensityAnalyzer()
 
+def _write_items(items: list) -> None:
+    """
+    Writes up to BATCH_WRITE_SIZE items to the sentiment table with one
+    BatchWriteItem call, retrying UnprocessedItems.
+    """
+    write_batch(client("dynamodb"), get_parameter("/app/tables/sentiment"), items)
 
-def handler(event, context):
 
-    try: 
-        # Extract the relevant information from the event
-        event_name = event['Records'][0]['eventName']
-
-        if event_name != "INSERT":
-            return {"status": "skipped"}
-        new_image = event['Records'][0]['dynamodb']['NewImage']
-                
-        review_id = new_image['reviewId']['S']
-
-        # Here now since we're extracting the information from the incoming event 
-        # our reviewText is already preprocessed       
-        review_text = new_image['content']['S']
-        
-        # Extract the overall score of the review
-        overall = new_image['overall']['N'] # This is a score from 1-5
-        # Convert the score to float
-        overall = float(overall)
-
-        # Execute the sentiment analysis for the review_text
-        scores = analyzer.polarity_scores(review_text)
-        compound = scores["compound"]
-        
-        if compound >=  0.05:
-            sentiment = "POSITIVE"
-        elif compound <= -0.05:
-            sentiment = "NEGATIVE"
-        else:
-            sentiment = "NEUTRAL"
-
-
-        
-        # Combine the "overall" and the sentiment of the review 
-        if overall is None:
-            final_sentiment = sentiment  # fallback
-        else:
-            if sentiment == "NEUTRAL":
-                if overall >= 4.0:
-                    final_sentiment = "POSITIVE"
-                elif overall <= 2.0:
-                    final_sentiment = "NEGATIVE"
-                else:
-                    final_sentiment = "NEUTRAL"
-            elif sentiment == "POSITIVE":
-                if overall <= 2.0:
-                    final_sentiment = "NEUTRAL"  # contradiction
-                else:
-                    final_sentiment = "POSITIVE"
-            elif sentiment == "NEGATIVE":
-                if overall >= 4.0:
-                    final_sentiment = "NEUTRAL"  # contradiction
-                else:
-                    final_sentiment = "NEGATIVE"
-            else:
-                final_sentiment = sentiment  # fallback
-        
+def _update_reviews(items: list) -> None:
+    """
+    Sets sentiment and the encoded scores of sentiment items on their
+    reviews rows, one update per row so isUnpolite of profanity_check is
+    kept. The updates run concurrently; the first failure is raised.
+    Their MODIFY records are dropped by the INSERT filter of the stream.
+    """
+    reviews_table = table("/app/tables/reviews")
+    ddb = reviews_table.meta.client
+
+    def _update(item):
+        ddb.update_item(
+            TableName=reviews_table.name,
+            Key={"reviewId": item['reviewId']},
+            UpdateExpression="SET sentiment = :s, scores = :c",
+            ExpressionAttributeValues={":s": item['sentiment'], ":c": item['scores']}
+        )
+
+    list(_update_pool.map(_update, items))
+
+
+def _parse_record(record: dict) -> dict:
+    """
+    Extracts the review of a single INSERT stream record.
+    """
+    # Extract the relevant information from the record
+    new_image = record['dynamodb']['NewImage']
+
+    review_id = new_image['reviewId']['S']
+
+    # Here now since we're extracting the information from the incoming event 
+    # our reviewText is already preprocessed       
+    review_text = new_image['content']['S']
     
-        item = {
-            'reviewId': review_id,
-            'sentiment': final_sentiment
-        }
-        # Upload the results in the sentiment table
-        table.put_item(Item=item)
+    # Extract the overall score of the review
+    overall = new_image['overall']['N'] # This is a score from 1-5
+    # Convert the score to float
+    overall = float(overall)
+
+    return {'reviewId': review_id, 'content': review_text, 'overall': overall}
+
 
-        
-        
-        
+def handler(event, context):
+    """
+    Processes every record of a DynamoDB Stream batch: scores all reviews
+    with one batch call, writes the results to the sentiment table in
+    batches and reports failed records as a partial batch response.
+    """
+    # (sequence number, review) of every record to score
+    reviews = []
+    failed_sequence_number = None
+    # Records that are not INSERTs, to measure the traffic event filtering saves
+    skipped = 0
+
+    for record in event.get('Records', []):
+        sequence_number = record['dynamodb']['SequenceNumber']
+        # The event source mapping only delivers INSERT records; emulators
+        # without event filtering still deliver MODIFY/REMOVE, skip those here
+        if record.get('eventName') != "INSERT":
+            skipped += 1
+            continue
+        try:
+            review = _parse_record(record)
+        except Exception as e:
+            print("ERROR processing record:", record)
+            print("Exception:", e)
+            # Lambda retries the batch from the first reported record onwards,
+            # so stop here instead of processing the remaining records twice
+            failed_sequence_number = sequence_number
+            break
+        reviews.append((sequence_number, review))
+
+    # Execute the sentiment analysis for all review texts at once,
+    # except for the texts whose scores are cached
+    sentiment_cache.prefetch([review['content'] for _, review in reviews])
+    scores = [sentiment_cache.get(review['content']) for _, review in reviews]
+    try:
+        # Texts repeated within the batch are scored once
+        missing = list(dict.fromkeys(review['content'] for (_, review), cached in zip(reviews, scores) if cached is None))
+        computed = dict(zip(missing, get_analyzer().polarity_scores_batch(missing)))
+        for content, review_scores in computed.items():
+            sentiment_cache.put(content, review_scores)
+        scores = [computed[review['content']] if cached is None else cached for (_, review), cached in zip(reviews, scores)]
     except Exception as e:
-        print("ERROR processing event:", event)
+        print("ERROR scoring sentiment batch:", [review['reviewId'] for _, review in reviews])
         print("Exception:", e)
-        raise e 
+        scores = []
+        if reviews:
+            failed_sequence_number = reviews[0][0]
+        reviews = []
+
+    # (sequence number, sentiment item) of every record still to be written;
+    # the raw scores and the rating are kept, so labels can be recomputed
+    # under a new policy without scoring again (scripts/relabel_sentiment.py)
+    pending = []
+    for (sequence_number, review), review_scores in zip(reviews, scores):
+        item = {
+            'reviewId': review['reviewId'],
+            'sentiment': classify(review_scores["compound"], review['overall']),
+            'scores': encode_scores(review_scores),
+            'overall': Decimal(str(review['overall']))
+        }
+        pending.append((sequence_number, item))
+
+    # A review may come twice in one batch (a redelivered record), but
+    # BatchWriteItem rejects duplicate keys in a request: keep its last item
+    last = {item['reviewId']: index for index, (_, item) in enumerate(pending)}
+    pending = [entry for index, entry in enumerate(pending) if last[entry[1]['reviewId']] == index]
+
+    # Upload the results in the sentiment table and/or the reviews rows
+    labels = Counter()
+    for start in range(0, len(pending), BATCH_WRITE_SIZE):
+        chunk = pending[start:start + BATCH_WRITE_SIZE]
+        try:
+            if SENTIMENT_STORAGE in ("table", "both"):
+                _write_items([item for _, item in chunk])
+            if SENTIMENT_STORAGE in ("reviews", "both"):
+                _update_reviews([item for _, item in chunk])
+        except Exception as e:
+            print("ERROR writing sentiment batch:", [item['reviewId'] for _, item in chunk])
+            print("Exception:", e)
+            # Every record from this chunk onwards is retried
+            failed_sequence_number = chunk[0][0]
+            break
+        labels.update(item['sentiment'] for _, item in chunk)
+
+    sentiment_cache.flush()
+    print("[sentiment_analysis] result cache", sentiment_cache.take_stats())
+    if skipped:
+        print(f"[sentiment_analysis] skipped {skipped} of {len(event.get('Records', []))} record(s) (not INSERT)")
+
+    # Count the written labels and the skipped records in the moderation statistics
+    try:
+        add_stats({
+            **{SENTIMENT_ATTRIBUTES[label]: count for label, count in labels.items()},
+            "sentimentSkippedRecords": skipped,
+            # Invocations for nothing but skipped records
+            "sentimentIdleInvocations": int(skipped > 0 and skipped == len(event.get('Records', [])))
+        })
+    except Exception as e:
+        # The statistics are best effort; a retry would count the batch twice
+        print("ERROR updating moderation statistics:", e)
 
-    return {"status": "ok"}
+    if failed_sequence_number is None:
+        return {"batchItemFailures": []}
+    return {"batchItemFailures": [{"itemIdentifier": failed_sequence_number}]}
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from config import client, get_parameter, resource
+
+# Results kept per container (least recently used are evicted)
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "10000"))
+
+# Shared cache table behind the in-container cache (optional, off unless the
+# deployment turns it on), and how long its entries live
+RESULT_CACHE_TABLE = os.getenv("RESULT_CACHE_TABLE", "false").lower() in ("1", "true", "yes")
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# BatchGetItem accepts at most 100 keys per call
+BATCH_GET_SIZE = 100
+
+# ──────────────────────────────────────────────────────────────
+# Internal helpers
+# ──────────────────────────────────────────────────────────────
+def _content_hash(content: str) -> str:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+class ResultCache:
+    """
+    Content-addressed cache of scoring results: an LRU per container,
+    backed by the optional DynamoDB cache table (/app/tables/result-cache)
+    whose items expire through TTL. Errors of the cache table are logged
+    and treated as misses, so scoring never fails because of the cache.
+    namespace separates the users of the table and has to change whenever
+    the scoring changes.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = RESULT_CACHE_SIZE, use_table: bool = RESULT_CACHE_TABLE):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.use_table = use_table
+        self._entries = OrderedDict()
+        # Keys fetched from the table and not used yet, to count table hits
+        self._from_table = set()
+        self._pending = {}
+        self._counts = {"local_hits": 0, "table_hits": 0, "misses": 0}
+
+    def _key(self, content: str) -> str:
+        return f"{self.namespace}#{_content_hash(content)}"
+
+    def _remember(self, key: str, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            self._from_table.discard(evicted)
+
+    def prefetch(self, contents: list) -> None:
+        """
+        Loads the cached results of contents that are not in the container
+        yet from the cache table, with batched reads.
+        """
+        if not self.use_table:
+            return
+        keys = list(dict.fromkeys(k for k in map(self._key, contents) if k not in self._entries))
+        try:
+            table_name = get_parameter("/app/tables/result-cache")
+            # The dynamodb client of config takes and returns plain values
+            ddb = client("dynamodb")
+            now = int(time.time())
+            for start in range(0, len(keys), BATCH_GET_SIZE):
+                request = {table_name: {"Keys": [{"contentHash": k} for k in keys[start:start + BATCH_GET_SIZE]]}}
+                while request:
+                    response = ddb.batch_get_item(RequestItems=request)
+                    for item in response["Responses"].get(table_name, []):
+                        # TTL deletion is lazy, so expired items may still be returned
+                        if item["expiresAt"] < now:
+                            continue
+                        key = item["contentHash"]
+                        self._remember(key, json.loads(item["result"]))
+                        self._from_table.add(key)
+                    request = response.get("UnprocessedKeys") or {}
+        except Exception as e:
+            print(f"ERROR reading result cache ({self.namespace}):", e)
+
+    def get(self, content: str):
+        """Cached result for content, or None."""
+        key = self._key(content)
+        if key not in self._entries:
+            self._counts["misses"] += 1
+            return None
+        if key in self._from_table:
+            self._from_table.discard(key)
+            self._counts["table_hits"] += 1
+        else:
+            self._counts["local_hits"] += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, content: str, value) -> None:
+        """Caches a JSON-serializable result; flush() writes it to the table."""
+        key = self._key(content)
+        self._remember(key, value)
+        if self.use_table:
+            self._pending[key] = value
+
+    def flush(self) -> None:
+        """Writes the results added since the last flush to the cache table."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            expires_at = int(time.time()) + RESULT_CACHE_TTL
+            table_name = get_parameter("/app/tables/result-cache")
+            with resource("dynamodb").Table(table_name).batch_writer(overwrite_by_pkeys=["contentHash"]) as batch:
+                for key, value in pending.items():
+                    batch.put_item(Item={"contentHash": key, "result": json.dumps(value), "expiresAt": expires_at})
+        except Exception as e:
+            print(f"ERROR writing result cache ({self.namespace}):", e)
+
+    def take_stats(self) -> dict:
+        """
+        Hit and miss counts since the last call, with the hit rate;
+        called once per invocation.
+        """
+        counts, self._counts = self._counts, {"local_hits": 0, "table_hits": 0, "misses": 0}
+        lookups = sum(counts.values())
+        hits = counts["local_hits"] + counts["table_hits"]
+        return {**counts, "hit_rate": round(hits / lookups, 3) if lookups else None, "size": len(self._entries)}
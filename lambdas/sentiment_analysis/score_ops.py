@@ -0,0 +1,73 @@
+import os
+
+# Fixed-point scales of the VADER scores, which VADER rounds to 4 (compound)
+# and 3 (pos/neg/neu) decimals, so the encoding loses nothing
+COMPOUND_SCALE = 10000
+PART_SCALE = 1000
+
+# Every score takes a 4-digit decimal field of the encoded number, after
+# the compound, which is offset by COMPOUND_SCALE to be non-negative:
+#   <compound + 1>(5 digits) <pos>(4) <neg>(4) <neu>(4)
+FIELD = 10 ** 4
+PARTS = ("pos", "neg", "neu")
+
+# Labelling policy: compound cut-offs, and the overall ratings that
+# confirm or contradict the text
+POLICY = {
+    "positive": float(os.getenv("SENTIMENT_POSITIVE_MIN", "0.05")),
+    "negative": float(os.getenv("SENTIMENT_NEGATIVE_MAX", "-0.05")),
+    "high_overall": float(os.getenv("SENTIMENT_HIGH_OVERALL", "4.0")),
+    "low_overall": float(os.getenv("SENTIMENT_LOW_OVERALL", "2.0")),
+}
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+def encode_scores(scores: dict) -> int:
+    """
+    Packs the compound/pos/neg/neu scores of polarity_scores into one
+    non-negative integer (at most 17 digits), stored as a single number.
+    """
+    value = round(scores["compound"] * COMPOUND_SCALE) + COMPOUND_SCALE
+    for part in PARTS:
+        value = value * FIELD + round(scores[part] * PART_SCALE)
+    return value
+
+def decode_scores(value) -> dict:
+    """
+    The scores packed by encode_scores; value may be an int or a Decimal.
+    """
+    value = int(value)
+    scores = {}
+    for part in reversed(PARTS):
+        value, field = divmod(value, FIELD)
+        scores[part] = field / PART_SCALE
+    scores["compound"] = (value - COMPOUND_SCALE) / COMPOUND_SCALE
+    return scores
+
+def classify(compound: float, overall: float | None, policy: dict = POLICY) -> str:
+    """
+    Turns the VADER compound score and the review's overall
+    rating into the final sentiment label.
+    """
+    if compound >= policy["positive"]:
+        sentiment = "POSITIVE"
+    elif compound <= policy["negative"]:
+        sentiment = "NEGATIVE"
+    else:
+        sentiment = "NEUTRAL"
+
+    # Combine the "overall" and the sentiment of the review
+    if overall is None:
+        return sentiment  # fallback
+    if sentiment == "NEUTRAL":
+        if overall >= policy["high_overall"]:
+            return "POSITIVE"
+        if overall <= policy["low_overall"]:
+            return "NEGATIVE"
+        return "NEUTRAL"
+    if sentiment == "POSITIVE":
+        # contradiction
+        return "NEUTRAL" if overall <= policy["low_overall"] else "POSITIVE"
+    # contradiction
+    return "NEUTRAL" if overall >= policy["high_overall"] else "NEGATIVE"
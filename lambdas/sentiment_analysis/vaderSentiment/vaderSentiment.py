@@ -16,10 +16,17 @@ import math
 import string
 import codecs
 import json
+import marshal
+import heapq
 from itertools import product
 from inspect import getsourcefile
 from io import open
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; polarity_scores_batch then finishes the scores in pure Python
+    np = None
+
 # ##Constants##
 
 # (empirically derived mean sentiment intensity rating increase for booster words)
@@ -40,6 +47,8 @@ NEGATE = \
      "oughtn't", "shan't", "shouldn't", "uh-uh", "wasn't", "weren't",
      "without", "wont", "wouldnt", "won't", "wouldn't", "rarely", "seldom", "despite"]
 
+NEGATE_SET = frozenset(NEGATE)
+
 # booster/dampener 'intensifiers' or 'degree adverbs'
 # http://en.wiktionary.org/wiki/Category:English_degree_adverbs
 
@@ -79,6 +88,11 @@ SPECIAL_CASES = {"the shit": 3, "the bomb": 3, "bad ass": 1.5, "badass": 1.5, "b
                  "yeah right": -2, "kiss of death": -1.5, "to die for": 3, "beating heart": 3.5}
 
 
+# precompiled lexicons written by compile_lexicons() and loaded instead of parsing the text files
+COMPILED_LEXICON_FILE = "lexicons.marshal"
+COMPILED_LEXICON_VERSION = 1
+
+
 # #Static methods# #
 
 def negated(input_words, include_nt=True):
@@ -86,10 +100,8 @@ def negated(input_words, include_nt=True):
     Determine if input contains negation words
     """
     input_words = [str(w).lower() for w in input_words]
-    neg_words = []
-    neg_words.extend(NEGATE)
-    for word in neg_words:
-        if word in input_words:
+    for word in input_words:
+        if word in NEGATE_SET:
             return True
     if include_nt:
         for word in input_words:
@@ -158,13 +170,19 @@ class SentiText(object):
     Identify sentiment-relevant string-level properties of input text.
     """
 
-    def __init__(self, text):
+    def __init__(self, text, token_pool=None):
         if not isinstance(text, str):
             text = str(text).encode('utf-8')
         self.text = text
         self.words_and_emoticons = self._words_and_emoticons()
         # doesn't separate words from\
         # adjacent punctuation (keeps emoticons & contractions)
+        # lower-cased once here instead of in every lookup while scoring
+        self.words_and_emoticons_lower = [w.lower() for w in self.words_and_emoticons]
+        if token_pool is not None:
+            # share one string object per distinct token across texts, so its
+            # hash is computed once for all lexicon lookups
+            self.words_and_emoticons_lower = [token_pool.setdefault(w, w) for w in self.words_and_emoticons_lower]
         self.is_cap_diff = allcap_differential(self.words_and_emoticons)
 
     @staticmethod
@@ -190,6 +208,43 @@ class SentiText(object):
         stripped = list(map(self._strip_punc_if_word, wes))
         return stripped
 
+def compile_lexicons(base_dir=None, lexicon_file="vader_lexicon.txt", emoji_lexicon="emoji_utf8_lexicon.txt"):
+    """
+    Parse both lexicon files once and write the resulting dictionaries to
+    COMPILED_LEXICON_FILE in base_dir (by default next to this module), so
+    SentimentIntensityAnalyzer can load them without re-parsing the text.
+    :returns: path of the written file
+    """
+    if base_dir is None:
+        base_dir = os.path.dirname(os.path.abspath(getsourcefile(lambda: 0)))
+    with codecs.open(os.path.join(base_dir, lexicon_file), encoding='utf-8') as f:
+        lexicon = SentimentIntensityAnalyzer.make_lex_dict(f.read())
+    with codecs.open(os.path.join(base_dir, emoji_lexicon), encoding='utf-8') as f:
+        emojis = SentimentIntensityAnalyzer.make_emoji_dict(f.read())
+
+    output_path = os.path.join(base_dir, COMPILED_LEXICON_FILE)
+    with open(output_path, 'wb') as f:
+        marshal.dump((COMPILED_LEXICON_VERSION, lexicon_file, emoji_lexicon, lexicon, emojis), f)
+    return output_path
+
+
+def load_compiled_lexicons(base_dir, lexicon_file, emoji_lexicon):
+    """
+    Load the dictionaries written by compile_lexicons()
+    :returns: `(lexicon, emojis)`, or `None` if there is no usable compiled
+        file for the given lexicon files
+    """
+    compiled_path = os.path.join(base_dir, COMPILED_LEXICON_FILE)
+    try:
+        with open(compiled_path, 'rb') as f:
+            version, compiled_lexicon_file, compiled_emoji_lexicon, lexicon, emojis = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (version, compiled_lexicon_file, compiled_emoji_lexicon) != (COMPILED_LEXICON_VERSION, lexicon_file, emoji_lexicon):
+        return None
+    return lexicon, emojis
+
+
 class SentimentIntensityAnalyzer(object):
     """
     Give a sentiment intensity score to sentences.
@@ -197,34 +252,42 @@ class SentimentIntensityAnalyzer(object):
 
     def __init__(self, lexicon_file="vader_lexicon.txt", emoji_lexicon="emoji_utf8_lexicon.txt"):
         _this_module_file_path_ = os.path.abspath(getsourcefile(lambda: 0))
-        lexicon_full_filepath = os.path.join(os.path.dirname(_this_module_file_path_), lexicon_file)
+        base_dir = os.path.dirname(_this_module_file_path_)
+
+        compiled = load_compiled_lexicons(base_dir, lexicon_file, emoji_lexicon)
+        if compiled is not None:
+            self.lexicon, self.emojis = compiled
+            return
+
+        # the raw file contents are only needed while building the dictionaries
+        lexicon_full_filepath = os.path.join(base_dir, lexicon_file)
         with codecs.open(lexicon_full_filepath, encoding='utf-8') as f:
-            self.lexicon_full_filepath = f.read()
-        self.lexicon = self.make_lex_dict()
+            self.lexicon = self.make_lex_dict(f.read())
 
-        emoji_full_filepath = os.path.join(os.path.dirname(_this_module_file_path_), emoji_lexicon)
+        emoji_full_filepath = os.path.join(base_dir, emoji_lexicon)
         with codecs.open(emoji_full_filepath, encoding='utf-8') as f:
-            self.emoji_full_filepath = f.read()
-        self.emojis = self.make_emoji_dict()
+            self.emojis = self.make_emoji_dict(f.read())
 
-    def make_lex_dict(self):
+    @staticmethod
+    def make_lex_dict(lexicon_text):
         """
-        Convert lexicon file to a dictionary
+        Convert lexicon file contents to a dictionary
         """
         lex_dict = {}
-        for line in self.lexicon_full_filepath.rstrip('\n').split('\n'):
+        for line in lexicon_text.rstrip('\n').split('\n'):
             if not line:
                 continue
             (word, measure) = line.strip().split('\t')[0:2]
             lex_dict[word] = float(measure)
         return lex_dict
 
-    def make_emoji_dict(self):
+    @staticmethod
+    def make_emoji_dict(emoji_text):
         """
-        Convert emoji lexicon file to a dictionary
+        Convert emoji lexicon file contents to a dictionary
         """
         emoji_dict = {}
-        for line in self.emoji_full_filepath.rstrip('\n').split('\n'):
+        for line in emoji_text.rstrip('\n').split('\n'):
             (emoji, description) = line.strip().split('\t')[0:2]
             emoji_dict[emoji] = description
         return emoji_dict
@@ -235,60 +298,99 @@ class SentimentIntensityAnalyzer(object):
         Positive values are positive valence, negative value are negative
         valence.
         """
+        sentiments, text = self._sentiments(text)
+
+        valence_dict = self.score_valence(sentiments, text)
+
+        return valence_dict
+
+    def polarity_scores_batch(self, texts):
+        """
+        Score a list of texts in one call.
+        Returns one dict per text, equal to what polarity_scores returns
+        for it. Duplicate texts are scored once, tokens are shared across
+        the batch for lexicon lookups, and the final normalization runs on
+        NumPy arrays when NumPy is available.
+        """
+        token_pool = {}
+        scored = {}
+        for text in texts:
+            if text not in scored:
+                scored[text] = self._sentiments(text, token_pool)
+
+        if np is None:
+            results = {text: self.score_valence(sentiments, clean_text)
+                       for text, (sentiments, clean_text) in scored.items()}
+        else:
+            results = self._score_valence_batch(scored)
+
+        return [dict(results[text]) for text in texts]
+
+    def _sentiments(self, text, token_pool=None):
+        """
+        Compute the per-token sentiments of text
+        :returns: `(sentiments, text)` with emojis in text replaced by their descriptions
+        """
         # convert emojis to their textual descriptions
-        text_no_emoji = ""
-        prev_space = True
-        for chr in text:
-            if chr in self.emojis:
-                # get the textual description
-                description = self.emojis[chr]
-                if not prev_space:
-                    text_no_emoji += ' '
-                text_no_emoji += description
-                prev_space = False
-            else:
-                text_no_emoji += chr
-                prev_space = chr == ' '
-        text = text_no_emoji.strip()
+        text = self._replace_emojis(text)
 
-        sentitext = SentiText(text)
+        sentitext = SentiText(text, token_pool)
 
         sentiments = []
         words_and_emoticons = sentitext.words_and_emoticons
+        words_and_emoticons_lower = sentitext.words_and_emoticons_lower
         for i, item in enumerate(words_and_emoticons):
             valence = 0
             # check for vader_lexicon words that may be used as modifiers or negations
-            if item.lower() in BOOSTER_DICT:
+            if words_and_emoticons_lower[i] in BOOSTER_DICT:
                 sentiments.append(valence)
                 continue
-            if (i < len(words_and_emoticons) - 1 and item.lower() == "kind" and
-                    words_and_emoticons[i + 1].lower() == "of"):
+            if (i < len(words_and_emoticons) - 1 and words_and_emoticons_lower[i] == "kind" and
+                    words_and_emoticons_lower[i + 1] == "of"):
                 sentiments.append(valence)
                 continue
 
             sentiments = self.sentiment_valence(valence, sentitext, item, i, sentiments)
 
-        sentiments = self._but_check(words_and_emoticons, sentiments)
+        sentiments = self._but_check(words_and_emoticons_lower, sentiments)
 
-        valence_dict = self.score_valence(sentiments, text)
+        return sentiments, text
 
-        return valence_dict
+    def _replace_emojis(self, text):
+        """
+        Replace every emoji with its textual description, separated from a
+        preceding non-space character by a single space
+        """
+        parts = []
+        prev_space = True
+        for chr in text:
+            if chr in self.emojis:
+                # get the textual description
+                if not prev_space:
+                    parts.append(' ')
+                parts.append(self.emojis[chr])
+                prev_space = False
+            else:
+                parts.append(chr)
+                prev_space = chr == ' '
+        return ''.join(parts).strip()
 
     def sentiment_valence(self, valence, sentitext, item, i, sentiments):
         is_cap_diff = sentitext.is_cap_diff
         words_and_emoticons = sentitext.words_and_emoticons
+        words_lower = sentitext.words_and_emoticons_lower
         item_lowercase = item.lower()
         if item_lowercase in self.lexicon:
             # get the sentiment valence 
             valence = self.lexicon[item_lowercase]
                 
             # check for "no" as negation for an adjacent lexicon item vs "no" as its own stand-alone lexicon item
-            if item_lowercase == "no" and i != len(words_and_emoticons)-1 and words_and_emoticons[i + 1].lower() in self.lexicon:
+            if item_lowercase == "no" and i != len(words_and_emoticons)-1 and words_lower[i + 1] in self.lexicon:
                 # don't use valence of "no" as a lexicon item. Instead set it's valence to 0.0 and negate the next item
                 valence = 0.0
-            if (i > 0 and words_and_emoticons[i - 1].lower() == "no") \
-               or (i > 1 and words_and_emoticons[i - 2].lower() == "no") \
-               or (i > 2 and words_and_emoticons[i - 3].lower() == "no" and words_and_emoticons[i - 1].lower() in ["or", "nor"] ):
+            if (i > 0 and words_lower[i - 1] == "no") \
+               or (i > 1 and words_lower[i - 2] == "no") \
+               or (i > 2 and words_lower[i - 3] == "no" and words_lower[i - 1] in ["or", "nor"] ):
                 valence = self.lexicon[item_lowercase] * N_SCALAR
             
             # check if sentiment laden word is in ALL CAPS (while others aren't)
@@ -302,51 +404,64 @@ class SentimentIntensityAnalyzer(object):
                 # dampen the scalar modifier of preceding words and emoticons
                 # (excluding the ones that immediately preceed the item) based
                 # on their distance from the current item.
-                if i > start_i and words_and_emoticons[i - (start_i + 1)].lower() not in self.lexicon:
+                if i > start_i and words_lower[i - (start_i + 1)] not in self.lexicon:
                     s = scalar_inc_dec(words_and_emoticons[i - (start_i + 1)], valence, is_cap_diff)
                     if start_i == 1 and s != 0:
                         s = s * 0.95
                     if start_i == 2 and s != 0:
                         s = s * 0.9
                     valence = valence + s
-                    valence = self._negation_check(valence, words_and_emoticons, start_i, i)
+                    valence = self._negation_check(valence, words_lower, start_i, i)
                     if start_i == 2:
-                        valence = self._special_idioms_check(valence, words_and_emoticons, i)
+                        valence = self._special_idioms_check(valence, words_lower, i)
 
-            valence = self._least_check(valence, words_and_emoticons, i)
+            valence = self._least_check(valence, words_lower, i)
         sentiments.append(valence)
         return sentiments
 
-    def _least_check(self, valence, words_and_emoticons, i):
+    def _least_check(self, valence, words_and_emoticons_lower, i):
         # check for negation case using "least"
-        if i > 1 and words_and_emoticons[i - 1].lower() not in self.lexicon \
-                and words_and_emoticons[i - 1].lower() == "least":
-            if words_and_emoticons[i - 2].lower() != "at" and words_and_emoticons[i - 2].lower() != "very":
+        if i > 1 and words_and_emoticons_lower[i - 1] not in self.lexicon \
+                and words_and_emoticons_lower[i - 1] == "least":
+            if words_and_emoticons_lower[i - 2] != "at" and words_and_emoticons_lower[i - 2] != "very":
                 valence = valence * N_SCALAR
-        elif i > 0 and words_and_emoticons[i - 1].lower() not in self.lexicon \
-                and words_and_emoticons[i - 1].lower() == "least":
+        elif i > 0 and words_and_emoticons_lower[i - 1] not in self.lexicon \
+                and words_and_emoticons_lower[i - 1] == "least":
             valence = valence * N_SCALAR
         return valence
 
     @staticmethod
-    def _but_check(words_and_emoticons, sentiments):
+    def _but_check(words_and_emoticons_lower, sentiments):
         # check for modification in sentiment due to contrastive conjunction 'but'
-        words_and_emoticons_lower = [str(w).lower() for w in words_and_emoticons]
         if 'but' in words_and_emoticons_lower:
             bi = words_and_emoticons_lower.index('but')
-            for sentiment in sentiments:
-                si = sentiments.index(sentiment)
+            # The original scaling visits each position k and rescales the
+            # *first* position holding an equal value (sentiments.index), so
+            # repeated values can be rescaled at a different position. Keep
+            # those semantics, but find the first position through a heap of
+            # candidate positions per value instead of a linear search.
+            positions = {}
+            for k, sentiment in enumerate(sentiments):
+                positions.setdefault(sentiment, []).append(k)
+            for k in range(len(sentiments)):
+                sentiment = sentiments[k]
+                candidates = positions[sentiment]
+                # drop positions whose value has changed since they were added
+                while sentiments[candidates[0]] != sentiment:
+                    heapq.heappop(candidates)
+                si = candidates[0]
                 if si < bi:
-                    sentiments.pop(si)
-                    sentiments.insert(si, sentiment * 0.5)
+                    scaled = sentiment * 0.5
                 elif si > bi:
-                    sentiments.pop(si)
-                    sentiments.insert(si, sentiment * 1.5)
+                    scaled = sentiment * 1.5
+                else:
+                    continue
+                sentiments[si] = scaled
+                heapq.heappush(positions.setdefault(scaled, []), si)
         return sentiments
 
     @staticmethod
-    def _special_idioms_check(valence, words_and_emoticons, i):
-        words_and_emoticons_lower = [str(w).lower() for w in words_and_emoticons]
+    def _special_idioms_check(valence, words_and_emoticons_lower, i):
         onezero = "{0} {1}".format(words_and_emoticons_lower[i - 1], words_and_emoticons_lower[i])
 
         twoonezero = "{0} {1} {2}".format(words_and_emoticons_lower[i - 2],
@@ -398,8 +513,7 @@ class SentimentIntensityAnalyzer(object):
         return valence
 
     @staticmethod
-    def _negation_check(valence, words_and_emoticons, start_i, i):
-        words_and_emoticons_lower = [str(w).lower() for w in words_and_emoticons]
+    def _negation_check(valence, words_and_emoticons_lower, start_i, i):
         if start_i == 0:
             if negated([words_and_emoticons_lower[i - (start_i + 1)]]):  # 1 word preceding lexicon word (w/o stopwords)
                 valence = valence * N_SCALAR
@@ -510,6 +624,54 @@ class SentimentIntensityAnalyzer(object):
 
         return sentiment_dict
 
+    def _score_valence_batch(self, scored):
+        """
+        score_valence over many texts with the arithmetic done on NumPy arrays.
+        Sums over each text's sentiments stay in Python so every element goes
+        through the same floating point operations as score_valence.
+        :param dict scored: text -> `(sentiments, text)` from _sentiments
+        :returns: dict text -> sentiment dict
+        """
+        texts = list(scored)
+        n = len(texts)
+        sum_s = np.zeros(n)
+        amplifier = np.zeros(n)
+        pos_sum = np.zeros(n)
+        neg_sum = np.zeros(n)
+        neu_count = np.zeros(n)
+        has_sentiments = np.zeros(n, dtype=bool)
+        for row, text in enumerate(texts):
+            sentiments, clean_text = scored[text]
+            if not sentiments:
+                continue
+            has_sentiments[row] = True
+            sum_s[row] = float(sum(sentiments))
+            amplifier[row] = self._punctuation_emphasis(clean_text)
+            pos_sum[row], neg_sum[row], neu_count[row] = self._sift_sentiment_scores(sentiments)
+
+        # compute and add emphasis from punctuation in text
+        sum_s = np.where(sum_s > 0, sum_s + amplifier, np.where(sum_s < 0, sum_s - amplifier, sum_s))
+        # normalize(), element-wise
+        compound = np.clip(sum_s / np.sqrt((sum_s * sum_s) + 15), -1.0, 1.0)
+
+        abs_neg_sum = np.fabs(neg_sum)
+        pos_adjusted = np.where(pos_sum > abs_neg_sum, pos_sum + amplifier, pos_sum)
+        neg_adjusted = np.where(pos_sum < abs_neg_sum, neg_sum - amplifier, neg_sum)
+
+        total = pos_adjusted + np.fabs(neg_adjusted) + neu_count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pos = np.where(has_sentiments, np.fabs(pos_adjusted / total), 0.0)
+            neg = np.where(has_sentiments, np.fabs(neg_adjusted / total), 0.0)
+            neu = np.where(has_sentiments, np.fabs(neu_count / total), 0.0)
+        compound = np.where(has_sentiments, compound, 0.0)
+
+        # round() on Python floats, as np.round can differ in the last digit
+        return {text: {"neg": round(float(neg[row]), 3),
+                       "neu": round(float(neu[row]), 3),
+                       "pos": round(float(pos[row]), 3),
+                       "compound": round(float(compound[row]), 4)}
+                for row, text in enumerate(texts)}
+
 
 if __name__ == '__main__':
     # --- examples -------
@@ -0,0 +1,115 @@
+import os
+import time
+import boto3
+from functools import lru_cache
+
+# ──────────────────────────────────────────────────────────────
+# Settings
+# ──────────────────────────────────────────────────────────────
+# All resource names live below this Parameter Store path
+PARAMETER_PATH = "/app"
+
+# Seconds a fetched set of parameters stays valid in a warm container
+CONFIG_TTL = float(os.getenv("CONFIG_TTL_SECONDS", "300"))
+
+# Startup mode: build heavy models (NLTK, VADER, profanity lists) at import
+# time instead of on first use, e.g. when running with provisioned concurrency
+EAGER_INIT = os.getenv("EAGER_INIT", "false").lower() in ("1", "true", "yes")
+
+_parameters = {}
+_loaded_at = None
+
+# ──────────────────────────────────────────────────────────────
+# Internal helpers
+# ──────────────────────────────────────────────────────────────
+def _endpoint() -> str:
+    host = os.getenv("LOCALSTACK_HOSTNAME", "localhost")
+    port = os.getenv("EDGE_PORT", "4566")
+    return f"http://{host}:{port}"
+
+def _region() -> str:
+    return os.getenv("AWS_REGION", "us-east-1")
+
+def _env_name(name: str) -> str:
+    """
+    Environment variable that overrides a parameter,
+    e.g. /app/tables/reviews -> APP_TABLES_REVIEWS.
+    """
+    return name.strip("/").replace("/", "_").replace("-", "_").upper()
+
+def _load_parameters() -> dict:
+    """
+    Fetches every parameter below PARAMETER_PATH with GetParametersByPath.
+    """
+    ssm = client("ssm")
+    parameters = {}
+    for page in ssm.get_paginator("get_parameters_by_path").paginate(Path=PARAMETER_PATH, Recursive=True):
+        for param in page["Parameters"]:
+            parameters[param["Name"]] = param["Value"]
+    return parameters
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+@lru_cache(maxsize=1)
+def session():
+    """
+    Returns the container-wide boto3 session. All clients and resources
+    are built from it, so botocore loads credentials, endpoints and
+    service models only once.
+    """
+    return boto3.session.Session(region_name=_region(),
+                                 aws_access_key_id="test", aws_secret_access_key="test")
+
+@lru_cache(maxsize=None)
+def client(service_name: str):
+    """
+    Returns the container-wide boto3 client for service_name.
+    """
+    if service_name == "dynamodb":
+        # Reuse the client behind the resource instead of building a second one
+        return resource("dynamodb").meta.client
+    return session().client(service_name, endpoint_url=_endpoint())
+
+@lru_cache(maxsize=None)
+def resource(service_name: str):
+    """
+    Returns the container-wide boto3 resource for service_name.
+    """
+    return session().resource(service_name, endpoint_url=_endpoint())
+
+def get_parameter(name: str) -> str:
+    """
+    Resolves a /app/... parameter.
+    An environment override wins; otherwise all parameters are loaded
+    with one SSM call and cached for CONFIG_TTL seconds. A name that is
+    not in SSM raises KeyError until the next reload.
+    """
+    global _parameters, _loaded_at
+
+    override = os.getenv(_env_name(name))
+    if override:
+        return override
+
+    # Names missing from SSM are answered from the loaded snapshot as well,
+    # so a lookup of an unknown name does not reload before the TTL expires
+    if _loaded_at is None or time.monotonic() - _loaded_at > CONFIG_TTL:
+        try:
+            _parameters = _load_parameters()
+        except Exception as e:
+            # Keep serving the last known values if SSM is unavailable
+            if name not in _parameters:
+                print(f"Error fetching {name} from SSM:", e)
+                raise
+            print("Error refreshing parameters from SSM, using cached values:", e)
+        _loaded_at = time.monotonic()
+
+    if name not in _parameters:
+        raise KeyError(f"SSM parameter not found: {name}")
+    return _parameters[name]
+
+def table(parameter_name: str):
+    """
+    Returns the DynamoDB Table whose name is stored under parameter_name.
+    """
+    return resource("dynamodb").Table(get_parameter(parameter_name))
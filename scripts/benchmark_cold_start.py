@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+scripts/benchmark_cold_start.py
+
+Measures the cold start of each Lambda locally and checks it against a budget:
+- init:      importing handler.py in a fresh interpreter (the Lambda init phase)
+- first use: building the models on the first record (NLTK, VADER, profanity lists)
+
+Every run uses a new Python process, so nothing is cached between runs. The
+table names are passed as environment overrides, so no SSM call is made and
+LocalStack does not need to be running.
+
+Usage:
+  python scripts/benchmark_cold_start.py [--runs 5] [--python python3.11]
+
+Exits with status 1 if the median cold start of any function exceeds its budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+LAMBDA_DIR = Path(__file__).resolve().parent.parent / "lambdas"
+
+# Budget per function in milliseconds (init + first use, median over all runs)
+COLD_START_BUDGET_MS = {
+    "preprocess":         1000,
+    "profanity_check":     600,
+    "sentiment_analysis":  600,
+}
+
+# Code executed after the import to trigger the lazily built models
+FIRST_USE = {
+    "preprocess":         "handler.preprocess('Great', 'This product works great')",
+    "profanity_check":    "handler.get_profanity_filter().is_profane('this product works great')",
+    "sentiment_analysis": "handler.get_analyzer().polarity_scores('product work great')",
+}
+
+CHILD_TEMPLATE = """
+import json, time
+t0 = time.perf_counter()
+import handler
+t1 = time.perf_counter()
+{first_use}
+t2 = time.perf_counter()
+print(json.dumps({{"init_ms": (t1 - t0) * 1000, "first_use_ms": (t2 - t1) * 1000}}))
+"""
+
+# Same overrides setup_resources.py passes to the deployed Lambdas
+ENV_OVERRIDES = {
+    "APP_BUCKETS_INPUT":       "reviews-input",
+    "APP_TABLES_REVIEWS":      "reviews",
+    "APP_TABLES_USERS":        "users",
+    "APP_TABLES_SENTIMENT":    "sentiment",
+    "APP_TABLES_CHECKPOINTS":  "ingest-checkpoints",
+    "APP_TABLES_STATS":        "stats",
+    "APP_TABLES_RESULT_CACHE": "result-cache",
+}
+
+
+def measure(fn_name: str, python: str) -> dict:
+    """Runs one cold start of fn_name in a fresh interpreter."""
+    env = {**os.environ, **ENV_OVERRIDES, "PYTHONDONTWRITEBYTECODE": "1",
+           # config.py is packaged from lambdas/shared into every function
+           "PYTHONPATH": str(LAMBDA_DIR / "shared")}
+    env.pop("EAGER_INIT", None)
+    result = subprocess.run(
+        [python, "-c", CHILD_TEMPLATE.format(first_use=FIRST_USE[fn_name])],
+        cwd=LAMBDA_DIR / fn_name,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{fn_name} failed to start:\n{result.stderr}")
+    # The handlers may print while starting; the timings are on the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per function")
+    parser.add_argument("--python", default=sys.executable, help="interpreter matching the Lambda runtime")
+    parser.add_argument("functions", nargs="*", default=list(COLD_START_BUDGET_MS), help="functions to measure")
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'function':<20}{'init ms':>10}{'first use ms':>14}{'total ms':>10}{'budget ms':>11}")
+    for fn_name in args.functions:
+        runs = [measure(fn_name, args.python) for _ in range(args.runs)]
+        init = statistics.median(r["init_ms"] for r in runs)
+        first_use = statistics.median(r["first_use_ms"] for r in runs)
+        total = statistics.median(r["init_ms"] + r["first_use_ms"] for r in runs)
+        budget = COLD_START_BUDGET_MS[fn_name]
+        flag = "" if total <= budget else "  OVER BUDGET"
+        print(f"{fn_name:<20}{init:>10.0f}{first_use:>14.0f}{total:>10.0f}{budget:>11}{flag}")
+        if total > budget:
+            over_budget.append(fn_name)
+
+    if over_budget:
+        print(f"Cold start budget exceeded: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+scripts/benchmark_pipeline.py
+
+End-to-end latency and throughput benchmark of the pipeline on LocalStack.
+Reviews from devset_data are uploaded under unique keys with the uploader of
+run_devset.py, and the tables are polled the way tests/test_pipeline.py waits
+for results (_wait_for_review, _wait_for_sentiment). Per review it records
+when, counted from the start of its upload,
+- review:    the reviews row appears (preprocess done)
+- profanity: the row has isUnpolite (profanity_check done)
+- sentiment: the sentiment row appears, or the reviews row has a sentiment
+             (sentiment_analysis done)
+
+Two load models:
+- open loop:   --rate N uploads N reviews per second regardless of progress
+- closed loop: --clients N keeps N reviews in flight; each client uploads
+               its next review once the previous one passed all stages
+
+Latencies are only as precise as --poll. p50/p95/p99 per stage, sustained
+throughput and timeouts are printed and written as JSON to --output.
+
+Usage:
+  python scripts/benchmark_pipeline.py [--count 200] [--rate 20 | --clients 8] [--output bench.json]
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import boto3
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from run_devset import REVIEW_DIR, _endpoint, make_s3_client, upload_all, upload_file  # noqa: E402
+
+STAGES = ("review", "profanity", "sentiment")
+
+# BatchGetItem accepts at most 100 keys per call
+BATCH_GET_SIZE = 100
+
+
+# ──────────────────────────────────────────────────────────────
+# Internal helpers
+# ──────────────────────────────────────────────────────────────
+def _percentile(sorted_values: list, q: float) -> float | None:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1)]
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+def _aws_client(service_name: str):
+    return boto3.client(service_name, endpoint_url=_endpoint(), region_name=os.getenv("AWS_REGION", "us-east-1"),
+                        aws_access_key_id="test", aws_secret_access_key="test")
+
+def _resource_names() -> dict:
+    """Resource names stored in SSM by setup_resources.py."""
+    ssm = _aws_client("ssm")
+
+    def _get(path: str) -> str:
+        return ssm.get_parameter(Name=f"/app/{path}")["Parameter"]["Value"]
+
+    return {"bucket": _get("buckets/input"), "reviews": _get("tables/reviews"), "sentiment": _get("tables/sentiment")}
+
+
+class _Tracker:
+    """
+    Upload times and stage completion times of all reviews in flight. One
+    monitor thread polls the tables with BatchGetItem for pending reviews.
+    """
+
+    def __init__(self, names: dict, poll: float, timeout: float):
+        self.names = names
+        self.poll = poll
+        self.timeout = timeout
+        self.ddb = _aws_client("dynamodb")
+        self.uploaded = {}        # key -> upload start (wall clock)
+        self.stages = {}          # key -> {stage: seconds after upload}
+        self.finished = {}        # key -> threading.Event, set when done or timed out
+        self.timed_out = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def add(self, key: str, upload_started: float) -> threading.Event:
+        with self._lock:
+            self.uploaded[key] = upload_started
+            self.stages[key] = {}
+            return self.finished.setdefault(key, threading.Event())
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for event in self.finished.values() if not event.is_set())
+
+    def _batch_get(self, table: str, keys: list) -> dict:
+        """Items of table by reviewId, strongly consistent like the tests' get_item."""
+        items = {}
+        for start in range(0, len(keys), BATCH_GET_SIZE):
+            request = {table: {"Keys": [{"reviewId": {"S": k}} for k in keys[start:start + BATCH_GET_SIZE]],
+                               "ConsistentRead": True}}
+            while request:
+                response = self.ddb.batch_get_item(RequestItems=request)
+                for item in response["Responses"].get(table, []):
+                    items[item["reviewId"]["S"]] = item
+                request = response.get("UnprocessedKeys") or {}
+        return items
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                pending = [k for k, event in self.finished.items() if not event.is_set() and k in self.uploaded]
+            if pending:
+                now = time.time()
+                reviews = self._batch_get(self.names["reviews"], pending)
+                sentiments = self._batch_get(self.names["sentiment"], pending)
+                with self._lock:
+                    for key in pending:
+                        seen = self.stages[key]
+                        elapsed = now - self.uploaded[key]
+                        if key in reviews:
+                            seen.setdefault("review", elapsed)
+                            if "isUnpolite" in reviews[key]:
+                                seen.setdefault("profanity", elapsed)
+                        # Sentiment table, or the reviews row with SENTIMENT_STORAGE=reviews
+                        if key in sentiments or "sentiment" in reviews.get(key, {}):
+                            seen.setdefault("sentiment", elapsed)
+                        if len(seen) == len(STAGES):
+                            self.finished[key].set()
+                        elif elapsed > self.timeout:
+                            self.timed_out.add(key)
+                            self.finished[key].set()
+            self._stop.wait(self.poll)
+
+    def report(self) -> dict:
+        with self._lock:
+            completed = [k for k, seen in self.stages.items() if len(seen) == len(STAGES)]
+            stages = {}
+            for stage in STAGES:
+                values = sorted(seen[stage] for seen in self.stages.values() if stage in seen)
+                stages[stage] = {
+                    "count": len(values),
+                    "p50_ms": _ms(_percentile(values, 0.50)),
+                    "p95_ms": _ms(_percentile(values, 0.95)),
+                    "p99_ms": _ms(_percentile(values, 0.99)),
+                    "max_ms": _ms(values[-1] if values else None),
+                }
+            if completed:
+                first_upload = min(self.uploaded.values())
+                last_done = max(self.uploaded[k] + max(self.stages[k].values()) for k in completed)
+                window = last_done - first_upload
+            else:
+                window = 0.0
+            return {
+                "uploaded": len(self.uploaded),
+                "completed": len(completed),
+                "timed_out": len(self.timed_out),
+                "window_s": window,
+                "throughput": len(completed) / window if window else 0.0,
+                "stages": stages,
+            }
+
+
+def _closed_loop(paths: list, keys: list, bucket: str, clients: int, tracker: _Tracker) -> None:
+    """
+    clients threads, each uploading its next review once the previous one
+    finished all stages (or timed out).
+    """
+    s3 = make_s3_client(clients)
+    work = iter(zip(paths, keys))
+    work_lock = threading.Lock()
+
+    def _client():
+        while True:
+            with work_lock:
+                item = next(work, None)
+            if item is None:
+                return
+            path, key = item
+            upload_started = time.time()
+            try:
+                upload_file(s3, bucket, path, key)
+            except Exception as e:
+                print(f"\nError uploading {key}: {e}")
+                continue
+            tracker.add(key, upload_started).wait()
+
+    threads = [threading.Thread(target=_client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=REVIEW_DIR, help="folder with the single review files")
+    parser.add_argument("--count", type=int, default=100, help="reviews to inject (files are reused if needed)")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--rate", type=float, default=10.0, help="open loop: uploads per second")
+    load.add_argument("--clients", type=int, help="closed loop: reviews kept in flight")
+    parser.add_argument("--concurrency", type=int, default=16, help="open loop: uploads in flight")
+    parser.add_argument("--poll", type=float, default=0.25, help="seconds between table polls")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds before a review counts as timed out")
+    parser.add_argument("--output", default="benchmark_pipeline.json", help="JSON file for the results")
+    args = parser.parse_args()
+
+    files = sorted(f for f in os.listdir(args.dir) if f.endswith(".json"))
+    if not files:
+        print("No files found in", args.dir)
+        sys.exit(2)
+
+    names = _resource_names()
+    run_id = uuid.uuid4().hex[:8]
+    paths = [os.path.join(args.dir, f) for f in itertools.islice(itertools.cycle(files), args.count)]
+    # Unique keys, so rows of earlier runs are never mistaken for results
+    keys = [f"bench-{run_id}-{i:06d}-{os.path.basename(p)}" for i, p in enumerate(paths)]
+
+    tracker = _Tracker(names, args.poll, args.timeout)
+    tracker.start()
+    mode = f"closed loop, {args.clients} clients" if args.clients else f"open loop, {args.rate:g} reviews/s"
+    print(f"Run {run_id}: {args.count} reviews, {mode}")
+
+    if args.clients:
+        _closed_loop(paths, keys, names["bucket"], args.clients, tracker)
+    else:
+        upload_all(paths, bucket=names["bucket"], concurrency=args.concurrency, rate=args.rate,
+                   keys=keys, on_uploaded=tracker.add)
+        while tracker.pending():
+            print(f"\rWaiting for {tracker.pending()} review(s)...   ", end="", flush=True)
+            time.sleep(1)
+        print()
+    tracker.stop()
+
+    report = tracker.report()
+    print(f"{'stage':<12}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, s in report["stages"].items():
+        row = [f"{s[k]:.0f}" if s[k] is not None else "-" for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms")]
+        print(f"{stage:<12}{s['count']:>7}" + "".join(f"{v:>10}" for v in row))
+    print(f"Completed {report['completed']}/{report['uploaded']} in {report['window_s']:.1f} s "
+          f"({report['throughput']:.2f} reviews/s), {report['timed_out']} timed out")
+
+    result = {
+        "run_id": run_id,
+        "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(min(tracker.uploaded.values(), default=0))),
+        "config": {
+            "count": args.count,
+            "mode": "closed" if args.clients else "open",
+            "rate": None if args.clients else args.rate,
+            "clients": args.clients,
+            "concurrency": None if args.clients else args.concurrency,
+            "poll_s": args.poll,
+            "timeout_s": args.timeout,
+        },
+        **report,
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
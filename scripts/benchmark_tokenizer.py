@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+scripts/benchmark_tokenizer.py
+
+Times the tokenizer modes of the preprocess Lambda over synthetic raw reviews:
+- regex: a single WORD_RE.findall pass
+- nltk:  word_tokenize (Punkt + Treebank) followed by the alphabetic filter
+
+The first nltk call also loads the Punkt model; it is reported separately as
+"first call", which is what a cold container pays on its first record.
+
+Usage:
+  python scripts/benchmark_tokenizer.py [--lengths 100 1000 5000] [--repeat 5]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+LAMBDA_DIR = Path(__file__).resolve().parent.parent / "lambdas" / "preprocess"
+
+# Plain words, contractions, compounds, numbers and punctuation
+VOCABULARY = [
+    "the", "product", "works", "great", "and", "price", "is", "right", "i",
+    "love", "it", "don't", "can't", "it's", "kids'", "well-made", "mp3",
+    "2nd", "$20", "e.g.", "really", "broken", "battery", "after", "a", "week",
+]
+PUNCTUATION = [" "] * 8 + [", ", ". ", "! ", "? ", "... ", " (", ") ", ": "]
+
+
+def make_review(length: int, rng: random.Random) -> str:
+    return "".join(rng.choice(VOCABULARY) + rng.choice(PUNCTUATION) for _ in range(length))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="review lengths in words")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per length (best is reported)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(LAMBDA_DIR))
+    from text_ops import tokenize
+
+    rng = random.Random(42)
+    reviews = {length: make_review(length, rng) for length in args.lengths}
+
+    start = time.perf_counter()
+    tokenize(reviews[args.lengths[0]], mode="nltk")
+    print(f"nltk first call (imports NLTK, loads Punkt): {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    print(f"{'words':>8}{'regex ms':>12}{'nltk ms':>12}{'speedup':>10}")
+    for length, review in reviews.items():
+        best = {}
+        for mode in ("regex", "nltk"):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                tokenize(review, mode=mode)
+                timings.append(time.perf_counter() - start)
+            best[mode] = min(timings)
+        print(f"{length:>8}{best['regex'] * 1000:>12.3f}{best['nltk'] * 1000:>12.3f}"
+              f"{best['nltk'] / best['regex']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+scripts/benchmark_vader.py
+
+Times SentimentIntensityAnalyzer.polarity_scores of the sentiment_analysis Lambda
+over synthetic preprocessed reviews of increasing length. With a linear-time
+scorer the time per token stays flat as reviews get longer.
+
+Usage:
+  python scripts/benchmark_vader.py [--lengths 100 1000 5000] [--repeat 5]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+LAMBDA_DIR = Path(__file__).resolve().parent.parent / "lambdas" / "sentiment_analysis"
+
+# Mix of neutral review words, lexicon words, boosters, negations and 'but'
+VOCABULARY = [
+    "product", "work", "price", "use", "quality", "battery", "day", "size",
+    "great", "good", "love", "bad", "poor", "terrible", "happy", "broken",
+    "very", "really", "extremely", "slightly", "kind", "of",
+    "not", "never", "without", "doubt", "least", "but", "no",
+]
+
+
+def make_review(length: int, rng: random.Random) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(length))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[100, 500, 1000, 2000, 5000, 10000],
+                        help="review lengths in tokens")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per length (best is reported)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(LAMBDA_DIR))
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    analyzer = SentimentIntensityAnalyzer()
+    rng = random.Random(42)
+
+    print(f"{'tokens':>8}{'best ms':>12}{'us/token':>12}")
+    for length in args.lengths:
+        review = make_review(length, rng)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            analyzer.polarity_scores(review)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{length:>8}{best * 1000:>12.2f}{best * 1e6 / length:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
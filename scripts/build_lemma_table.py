@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+scripts/build_lemma_table.py
+
+Precomputes the WordNet lemmas of the most frequent review words for the
+preprocess Lambda. The table is written to lambdas/preprocess/lemma_table.tsv,
+packaged with the Lambda and loaded at startup, so those words cost a dict
+lookup instead of a WordNet morphy walk. Words are counted after tokenizing
+and stop-word removal, exactly as preprocess() sees them.
+
+Usage:
+  python scripts/build_lemma_table.py [--input reviews_devset.json] [--top 5000]
+
+The input is a JSON Lines file of reviews (summary, reviewText), such as the
+devset used by prepare_devset.py. Without the table the Lambda falls back to
+its LRU cache only.
+
+setup_resources.py runs this automatically before packaging the Lambda (after
+build_wordnet_morphology.py). The devset is not part of the repository: if the
+input is missing, the step is skipped and an existing table is kept.
+"""
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+LAMBDA_DIR = Path(__file__).resolve().parent.parent / "lambdas" / "preprocess"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default="./reviews_devset.json", help="JSON Lines file of reviews")
+    parser.add_argument("--top", type=int, default=5000, help="number of most frequent words to include")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(LAMBDA_DIR))
+    from text_ops import LEMMA_TABLE_FILE, STOP_WORDS, get_lemmatiser, tokenize
+
+    if not Path(args.input).exists():
+        kept = "keeping the existing table" if LEMMA_TABLE_FILE.exists() else "the Lambda runs without a lemma table"
+        print(f"No reviews at {args.input}, skipping ({kept})")
+        return
+
+    counts = Counter()
+    reviews = 0
+    with open(args.input, encoding="utf-8") as fh:
+        for line in fh:
+            review = json.loads(line)
+            raw = f"{review.get('summary')} {review.get('reviewText')}".lower()
+            counts.update(t for t in tokenize(raw) if t not in STOP_WORDS)
+            reviews += 1
+
+    lemmatiser = get_lemmatiser()
+    with LEMMA_TABLE_FILE.open("w", encoding="utf-8") as fh:
+        fh.write(f"# top {args.top} words of {reviews} reviews ({args.input}), most frequent first\n")
+        for word, _ in counts.most_common(args.top):
+            fh.write(f"{word}\t{lemmatiser.lemmatize(word)}\n")
+
+    covered = sum(count for _, count in counts.most_common(args.top))
+    total = sum(counts.values()) or 1
+    print(f"Wrote {min(args.top, len(counts))} lemmas -> {LEMMA_TABLE_FILE} "
+          f"(covers {covered / total:.1%} of {total} tokens)")
+
+
+if __name__ == "__main__":
+    main()
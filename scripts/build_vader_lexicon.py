@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+scripts/build_vader_lexicon.py
+
+Compiles the VADER text lexicons of the sentiment_analysis Lambda
+(vader_lexicon.txt, emoji_utf8_lexicon.txt) into vaderSentiment/lexicons.marshal,
+which SentimentIntensityAnalyzer loads instead of parsing the text files.
+
+Run with the interpreter of the Lambda runtime (marshal output is tied to it):
+  python scripts/build_vader_lexicon.py
+
+setup_resources.py runs this automatically before packaging the Lambda.
+"""
+import sys
+from pathlib import Path
+
+LAMBDA_DIR = Path(__file__).resolve().parent.parent / "lambdas" / "sentiment_analysis"
+
+
+def main():
+    sys.path.insert(0, str(LAMBDA_DIR))
+    from vaderSentiment.vaderSentiment import compile_lexicons
+
+    output_path = compile_lexicons()
+    print(f"Compiled VADER lexicons -> {output_path}")
+
+
+if __name__ == "__main__":
+    main()
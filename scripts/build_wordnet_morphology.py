@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+scripts/build_wordnet_morphology.py
+
+Compiles the WordNet index and exception files into
+lambdas/preprocess/wordnet_morphy.marshal, which the preprocess Lambda uses to
+lemmatise without the WordNet corpus or NLTK's WordNetCorpusReader.
+
+WordNet is looked up on the NLTK data path (NLTK_DATA, ~/nltk_data, ...) and
+downloaded into a temporary directory if it is not there; only this build step
+needs it, the Lambda does not. A usable compiled file is kept unless --force
+is given, so packaging does not need network access.
+
+Usage:
+  python scripts/build_wordnet_morphology.py [--force]
+
+setup_resources.py runs this automatically before packaging the Lambda.
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+LAMBDA_DIR = Path(__file__).resolve().parent.parent / "lambdas" / "preprocess"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="rebuild even if a usable compiled file exists")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(LAMBDA_DIR))
+    from morphy import MORPHOLOGY_FILE, MorphyLemmatiser, compile_morphology
+
+    if not args.force and MorphyLemmatiser.load() is not None:
+        print(f"WordNet morphology is up to date: {MORPHOLOGY_FILE}")
+        return
+
+    import nltk
+
+    with tempfile.TemporaryDirectory() as download_dir:
+        try:
+            corpus = nltk.data.find("corpora/wordnet")
+        except LookupError:
+            print("WordNet not found on the NLTK data path, downloading it")
+            if not nltk.download("wordnet", download_dir=download_dir, quiet=True):
+                sys.exit("Downloading WordNet failed")
+            nltk.data.path.append(download_dir)
+            corpus = nltk.data.find("corpora/wordnet")
+
+        output_path = compile_morphology(lambda name: corpus.join(name).open(encoding="utf-8"))
+    print(f"Compiled WordNet morphology -> {output_path}")
+
+
+if __name__ == "__main__":
+    main()
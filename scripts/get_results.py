@@ -1,10 +1,17 @@
+import argparse
 import os
-import boto3
-from decimal import Decimal
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-import pandas as pd
 
-print("Script gestartet")
+import boto3
+import botocore.config
+
+# Sparse index of the reviews table over the rows with a sentiment
+# (created by setup_resources.py, filled with SENTIMENT_STORAGE=reviews/both)
+SENTIMENT_INDEX = "sentiment-index"
+SENTIMENT_LABELS = ("POSITIVE", "NEGATIVE", "NEUTRAL")
+
 # ──────────────────────────────────────────────────────────────
 # Internal helpers
 # ──────────────────────────────────────────────────────────────
@@ -13,54 +20,145 @@ def _endpoint() -> str:
     port = os.getenv("EDGE_PORT", "4566")
     return f"http://{host}:{port}"
 
-@lru_cache(maxsize=1)
-def _tableUsers():
-    endpoint = _endpoint()
-    region   = os.getenv("AWS_REGION", "us-east-1")
-    ssm = boto3.client("ssm", endpoint_url=endpoint, region_name=region,
-                       aws_access_key_id="test", aws_secret_access_key="test",
-                       config=boto3.session.Config(connect_timeout=5, read_timeout=5))
-    users_table_name = ssm.get_parameter(Name="/app/tables/users")["Parameter"]["Value"]
-    ddb = boto3.resource("dynamodb", endpoint_url=endpoint, region_name=region,
-                         aws_access_key_id="test", aws_secret_access_key="test")
-    return ddb.Table(users_table_name)
-
-def _tableSentiment():
-    # DynamoDB table name (stub uses a fixed name; real code will read from SSM)
-    TABLE_NAME = "sentiment"
-
-    # Initialize DynamoDB resource
-    ddb = boto3.resource(
-        "dynamodb",
-        endpoint_url=_endpoint(),
-        region_name=os.getenv("AWS_REGION", "us-east-1"),
-        aws_access_key_id="test",
-        aws_secret_access_key="test"
-    )
-    return ddb.Table(TABLE_NAME)
-
-# Read the data from the sentiment table
-tbl_sent = _tableSentiment()
-response_sent = tbl_sent.scan()
-items_sent = response_sent['Items']
-
-# Convert to pandas dataframe for easy evaluation
-df_sent = pd.DataFrame(items_sent)
-
-# Count the different sentiments 
-freq_table = df_sent['sentiment'].value_counts()
-for idx, val in freq_table.items():
-    print(f"Number of {idx.lower()} reviews: {val}")
-
-
-# Read the data from the user table
-tbl_user = _tableUsers()
-response_user = tbl_user.scan()
-items_user = response_user['Items']
-
-# Convert to pandas dataframe for easy evaluation
-df_user = pd.DataFrame(items_user)
-
-# Sum up the reviews containing profanity and banned customers
-print(f"Number of reviews containing profanity: {df_user['unpoliteCount'].sum()}")
-print(f"Number of banned customers: {df_user['banned'].sum()}")
+def _client(service_name: str, max_pool_connections: int = 10):
+    return boto3.client(service_name, endpoint_url=_endpoint(), region_name=os.getenv("AWS_REGION", "us-east-1"),
+                        aws_access_key_id="test", aws_secret_access_key="test",
+                        config=botocore.config.Config(connect_timeout=5, read_timeout=30,
+                                                      max_pool_connections=max_pool_connections))
+
+@lru_cache(maxsize=None)
+def _table_name(parameter_name: str) -> str:
+    return _client("ssm").get_parameter(Name=parameter_name)["Parameter"]["Value"]
+
+def _scan_segment(ddb, table_name: str, projection: list, segment: int, segments: int, count_item) -> Counter:
+    """
+    Scans one segment page by page (following LastEvaluatedKey) and folds
+    every item into a Counter with count_item, so no page is kept around.
+    """
+    counts = Counter()
+    kwargs = {
+        "TableName": table_name,
+        "ProjectionExpression": ", ".join(f"#p{i}" for i in range(len(projection))),
+        "ExpressionAttributeNames": {f"#p{i}": name for i, name in enumerate(projection)},
+        "Segment": segment,
+        "TotalSegments": segments,
+    }
+    while True:
+        page = ddb.scan(**kwargs)
+        for item in page["Items"]:
+            count_item(item, counts)
+        if "LastEvaluatedKey" not in page:
+            return counts
+        kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+def parallel_count(table_name: str, projection: list, count_item, segments: int = 4) -> Counter:
+    """
+    Aggregates a whole table with a parallel scan of segments segments,
+    one worker thread each, fetching only the projected attributes.
+    """
+    ddb = _client("dynamodb", max_pool_connections=max(10, segments))
+    with ThreadPoolExecutor(max_workers=segments) as pool:
+        results = pool.map(
+            lambda segment: _scan_segment(ddb, table_name, projection, segment, segments, count_item),
+            range(segments)
+        )
+        return sum(results, Counter())
+
+def query_count(table_name: str, index_name: str, key_name: str, value: str) -> int:
+    """
+    Number of items of an index with key_name = value, from a Query with
+    Select=COUNT followed page by page; no items are transferred.
+    """
+    ddb = _client("dynamodb")
+    kwargs = {
+        "TableName": table_name,
+        "IndexName": index_name,
+        "KeyConditionExpression": "#k = :v",
+        "ExpressionAttributeNames": {"#k": key_name},
+        "ExpressionAttributeValues": {":v": {"S": value}},
+        "Select": "COUNT",
+    }
+    count = 0
+    while True:
+        page = ddb.query(**kwargs)
+        count += page["Count"]
+        if "LastEvaluatedKey" not in page:
+            return count
+        kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+def index_sentiment_counts() -> Counter:
+    """
+    Reviews per sentiment label, one Query on the sentiment index of the
+    reviews table per label, run in parallel.
+    """
+    table_name = _table_name("/app/tables/reviews")
+    with ThreadPoolExecutor(max_workers=len(SENTIMENT_LABELS)) as pool:
+        counts = pool.map(lambda label: query_count(table_name, SENTIMENT_INDEX, "sentiment", label), SENTIMENT_LABELS)
+        return Counter(dict(zip(SENTIMENT_LABELS, counts)))
+
+def read_stats() -> dict | None:
+    """
+    The running statistics the pipeline keeps in the stats table
+    ({attribute: count}), read with a single get_item.
+    """
+    item = _client("dynamodb").get_item(
+        TableName=_table_name("/app/tables/stats"),
+        Key={"statId": {"S": "moderation"}},
+        ConsistentRead=True
+    ).get("Item")
+    if item is None:
+        return None
+    return {name: int(value["N"]) for name, value in item.items() if "N" in value}
+
+def count_sentiment(item: dict, counts: Counter) -> None:
+    if "sentiment" in item:
+        counts[item["sentiment"]["S"]] += 1
+
+def count_user(item: dict, counts: Counter) -> None:
+    if "unpoliteCount" in item:
+        counts["unpolite"] += int(item["unpoliteCount"]["N"])
+    if item.get("banned", {}).get("BOOL"):
+        counts["banned"] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarizes the sentiment and moderation results.")
+    parser.add_argument("--scan", action="store_true",
+                        help="recount by scanning the tables instead of reading the stats item")
+    parser.add_argument("--index", action="store_true",
+                        help="with --scan, count sentiments with queries on the sentiment index of the reviews "
+                             "table (SENTIMENT_STORAGE=reviews/both) instead of scanning the sentiment table")
+    parser.add_argument("--segments", type=int, default=4, help="parallel scan segments (one thread each)")
+    args = parser.parse_args()
+
+    stats = None if args.scan else read_stats()
+    if stats is not None:
+        for label in ("positive", "negative", "neutral"):
+            print(f"Number of {label} reviews: {stats.get(f'{label}Reviews', 0)}")
+        print(f"Number of reviews containing profanity: {stats.get('profaneReviews', 0)}")
+        print(f"Number of banned customers: {stats.get('bannedUsers', 0)}")
+        # Stream records the Lambdas received but discarded (0 with event filtering)
+        for fn, prefix in (("profanity_check", "profanity"), ("sentiment_analysis", "sentiment")):
+            print(f"Non-INSERT records skipped by {fn}: {stats.get(f'{prefix}SkippedRecords', 0)} "
+                  f"({stats.get(f'{prefix}IdleInvocations', 0)} invocation(s) with nothing else)")
+        return
+
+    # Count the different sentiments
+    if args.index:
+        sentiments = index_sentiment_counts()
+    else:
+        sentiments = parallel_count(_table_name("/app/tables/sentiment"), ["sentiment"], count_sentiment, args.segments)
+    for label, count in sentiments.most_common():
+        print(f"Number of {label.lower()} reviews: {count}")
+
+    # Sum up the reviews containing profanity and banned customers
+    users = parallel_count(_table_name("/app/tables/users"), ["unpoliteCount", "banned"], count_user, args.segments)
+    print(f"Number of reviews containing profanity: {users['unpolite']}")
+    print(f"Number of banned customers: {users['banned']}")
+
+
+if __name__ == "__main__":
+    main()
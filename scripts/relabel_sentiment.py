@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+scripts/relabel_sentiment.py
+
+Re-labels stored sentiment results under a new policy (compound cut-offs
+and overall-rating rules) without running the pipeline again. The VADER
+scores that sentiment_analysis keeps in the encoded `scores` attribute are
+read with a parallel scan, classified with score_ops.classify of the
+Lambda, and only the items whose label changes are written:
+- table layout:   BatchWriteItem puts of the whole sentiment item
+- reviews layout: one UpdateItem per row (other attributes are kept)
+The label counters of the stats item are corrected by the difference
+(pass --no-stats when relabelling the second of two layouts).
+Items written before scores were stored are counted and left alone.
+
+Usage:
+  python scripts/relabel_sentiment.py [--positive 0.1] [--negative -0.1]
+         [--high-overall 4] [--low-overall 2] [--storage table|reviews] [--dry-run]
+
+Set the same policy on the Lambda (SENTIMENT_POSITIVE_MIN,
+SENTIMENT_NEGATIVE_MAX, SENTIMENT_HIGH_OVERALL, SENTIMENT_LOW_OVERALL) so
+new reviews follow it.
+"""
+import argparse
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from get_results import _client, _table_name  # noqa: E402
+
+LAMBDAS_DIR = Path(__file__).resolve().parent.parent / "lambdas"
+sys.path.insert(0, str(LAMBDAS_DIR / "shared"))
+sys.path.insert(0, str(LAMBDAS_DIR / "sentiment_analysis"))
+# The label attributes and the retrying batch writer of the Lambda
+from batch_ops import BATCH_WRITE_SIZE, write_batch  # noqa: E402
+from score_ops import POLICY, classify, decode_scores  # noqa: E402
+from stats_ops import SENTIMENT_ATTRIBUTES  # noqa: E402
+
+
+# ──────────────────────────────────────────────────────────────
+# Internal helpers
+# ──────────────────────────────────────────────────────────────
+def _relabel_segment(ddb, table_name: str, storage: str, policy: dict, segment: int, segments: int,
+                     dry_run: bool) -> Counter:
+    """
+    Scans one segment page by page and rewrites the items whose label
+    changes under policy. Returns counts of the segment: items scanned,
+    changed, without scores, and the label delta per label.
+    """
+    counts = Counter()
+    kwargs = {"TableName": table_name, "Segment": segment, "TotalSegments": segments}
+    if storage == "reviews":
+        # Rows without sentiment (not scored yet) carry nothing to relabel
+        projection = ["reviewId", "sentiment", "scores", "overall"]
+        kwargs.update(ProjectionExpression=", ".join(f"#p{i}" for i in range(len(projection))),
+                      ExpressionAttributeNames={f"#p{i}": name for i, name in enumerate(projection)},
+                      FilterExpression="attribute_exists(#p1)")
+    pending = []
+    while True:
+        page = ddb.scan(**kwargs)
+        for item in page["Items"]:
+            counts["scanned"] += 1
+            if "scores" not in item:
+                counts["without_scores"] += 1
+                continue
+            overall = float(item["overall"]["N"]) if "overall" in item else None
+            label = classify(decode_scores(item["scores"]["N"])["compound"], overall, policy)
+            old = item["sentiment"]["S"]
+            if label == old:
+                continue
+            counts["changed"] += 1
+            counts[f"delta:{old}"] -= 1
+            counts[f"delta:{label}"] += 1
+            if dry_run:
+                continue
+            if storage == "reviews":
+                ddb.update_item(TableName=table_name, Key={"reviewId": item["reviewId"]},
+                                UpdateExpression="SET sentiment = :s",
+                                ExpressionAttributeValues={":s": {"S": label}})
+            else:
+                pending.append({**item, "sentiment": {"S": label}})
+                if len(pending) == BATCH_WRITE_SIZE:
+                    write_batch(ddb, table_name, pending)
+                    pending = []
+        if "LastEvaluatedKey" not in page:
+            break
+        kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+    if pending:
+        write_batch(ddb, table_name, pending)
+    return counts
+
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+def relabel(storage: str, policy: dict, segments: int = 4, dry_run: bool = False) -> Counter:
+    """
+    Relabels every stored result of the storage layout ("table" or
+    "reviews") under policy, with a parallel scan of segments segments.
+    """
+    table_name = _table_name("/app/tables/reviews" if storage == "reviews" else "/app/tables/sentiment")
+    ddb = _client("dynamodb", max_pool_connections=max(10, segments))
+    with ThreadPoolExecutor(max_workers=segments) as pool:
+        results = pool.map(
+            lambda segment: _relabel_segment(ddb, table_name, storage, policy, segment, segments, dry_run),
+            range(segments)
+        )
+        # update() instead of sum(): the label deltas may be negative
+        counts = Counter()
+        for result in results:
+            counts.update(result)
+        return counts
+
+def apply_stats_delta(counts: Counter) -> None:
+    """
+    Moves the label counters of the stats item by the relabelling delta.
+    """
+    delta = {SENTIMENT_ATTRIBUTES[name.split(":", 1)[1]]: n
+             for name, n in counts.items() if name.startswith("delta:") and n}
+    if not delta:
+        return
+    names = sorted(delta)
+    _client("dynamodb").update_item(
+        TableName=_table_name("/app/tables/stats"),
+        Key={"statId": {"S": "moderation"}},
+        UpdateExpression="ADD " + ", ".join(f"#a{i} :n{i}" for i in range(len(names))),
+        ExpressionAttributeNames={f"#a{i}": name for i, name in enumerate(names)},
+        ExpressionAttributeValues={f":n{i}": {"N": str(delta[name])} for i, name in enumerate(names)}
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--positive", type=float, default=POLICY["positive"], help="lowest positive compound")
+    parser.add_argument("--negative", type=float, default=POLICY["negative"], help="highest negative compound")
+    parser.add_argument("--high-overall", type=float, default=POLICY["high_overall"],
+                        help="rating from which a review reads as positive")
+    parser.add_argument("--low-overall", type=float, default=POLICY["low_overall"],
+                        help="rating up to which a review reads as negative")
+    parser.add_argument("--storage", choices=("table", "reviews"), default="table",
+                        help="layout to relabel: sentiment table or reviews rows (SENTIMENT_STORAGE)")
+    parser.add_argument("--segments", type=int, default=4, help="parallel scan segments (one thread each)")
+    parser.add_argument("--dry-run", action="store_true", help="count the changes without writing")
+    parser.add_argument("--no-stats", action="store_true",
+                        help="leave the stats item alone (for the second layout with SENTIMENT_STORAGE=both)")
+    args = parser.parse_args()
+
+    policy = {"positive": args.positive, "negative": args.negative,
+              "high_overall": args.high_overall, "low_overall": args.low_overall}
+    counts = relabel(args.storage, policy, args.segments, args.dry_run)
+    if not args.dry_run and not args.no_stats:
+        apply_stats_delta(counts)
+
+    print(f"Scanned {counts['scanned']} item(s), {counts['changed']} relabelled"
+          f"{' (dry run)' if args.dry_run else ''}, {counts['without_scores']} without scores")
+    for label in SENTIMENT_ATTRIBUTES:
+        print(f"  {label.lower():<8} {counts[f'delta:{label}']:+d}")
+
+
+if __name__ == "__main__":
+    main()
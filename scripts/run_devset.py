@@ -1,66 +1,232 @@
+#!/usr/bin/env python3
+"""
+scripts/run_devset.py
+
+Uploads single reviews from the devset_data folder to the input bucket, which
+triggers the pipeline. Uploads run in-process with one boto3 S3 client on a
+bounded thread pool, optionally paced to a target rate, and are retried with
+exponential backoff. A live line reports throughput and upload latency.
+
+Usage:
+  python scripts/run_devset.py [count | all | 20%] [--concurrency 16] [--rate 50]
+
+count defaults to 9 reviews; --rate 0 uploads as fast as the pool allows.
+"""
+import argparse
+import math
 import os
+import random
 import sys
-import subprocess
-import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# With this script we go through all single reviews from the devset_data folder
+import boto3
+import botocore.config
+import botocore.exceptions
 
-def main():
-    review_dir = "./devset_data"
-    default_count = 9
+REVIEW_DIR = "./devset_data"
+BUCKET = "reviews-input"
+DEFAULT_COUNT = 9
 
-    # Handle argument
-    arg = sys.argv[1] if len(sys.argv) > 1 else None
 
-    # Gather JSON files
-    files = sorted([f for f in os.listdir(review_dir) if f.endswith('.json')])
+# ──────────────────────────────────────────────────────────────
+# Internal helpers
+# ──────────────────────────────────────────────────────────────
+def _endpoint() -> str:
+    host = os.getenv("LOCALSTACK_HOSTNAME", "localhost")
+    port = os.getenv("EDGE_PORT", "4566")
+    return f"http://{host}:{port}"
 
-    if not files:
-        print("No files found in", review_dir)
-        return
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1)]
+
+
+class _Progress:
+    """
+    Thread-safe counters of an upload run, printed as one live line.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.started = time.monotonic()
+        self.latencies = []
+        self.errors = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float | None, retries: int) -> None:
+        with self._lock:
+            self.retries += retries
+            if latency is None:
+                self.errors += 1
+            else:
+                self.latencies.append(latency)
+
+    def done(self) -> int:
+        with self._lock:
+            return len(self.latencies) + self.errors
+
+    def summary(self) -> dict:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            errors, retries = self.errors, self.retries
+        elapsed = time.monotonic() - self.started
+        return {
+            "uploaded": len(latencies),
+            "errors": errors,
+            "retries": retries,
+            "elapsed_s": elapsed,
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": _percentile(latencies, 0.50) * 1000,
+            "p95_ms": _percentile(latencies, 0.95) * 1000,
+            "p99_ms": _percentile(latencies, 0.99) * 1000,
+        }
 
-    # Determine which files to process
+    def print_line(self, end: str = "") -> None:
+        s = self.summary()
+        done = s["uploaded"] + s["errors"]
+        # Nothing to upload counts as complete
+        share = done / self.total if self.total else 1.0
+        print(f"\rUploaded {done}/{self.total} ({share:.1%})  "
+              f"{s['throughput']:.1f} obj/s  p50 {s['p50_ms']:.0f} ms  p95 {s['p95_ms']:.0f} ms  "
+              f"errors {s['errors']}  retries {s['retries']}", end=end, flush=True)
+
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+def select_files(files: list, arg: str | None) -> list:
+    """
+    Picks the files to upload: the first DEFAULT_COUNT, 'all', '20%' or a count.
+    Raises ValueError for any other argument.
+    """
     if arg is None:
-        to_process = files[:default_count]
-    elif arg == "all":
-        to_process = files
-    elif arg == "20%":
-        count = math.ceil(len(files) * 0.2)
-        to_process = files[:count]
-    else:
-        try:
-            count = int(arg)
-            to_process = files[:count]
-        except ValueError:
-            print(f"Invalid argument: {arg} (must be integer or 'all')")
-            return
+        return files[:DEFAULT_COUNT]
+    if arg == "all":
+        return files
+    if arg == "20%":
+        return files[:math.ceil(len(files) * 0.2)]
+    try:
+        return files[:int(arg)]
+    except ValueError:
+        raise ValueError(f"Invalid argument: {arg} (must be integer, '20%' or 'all')") from None
 
-    total = len(to_process)
-    print(f"Processing {total} file(s)...")
+def make_s3_client(concurrency: int):
+    """
+    S3 client for LocalStack with a connection pool large enough for
+    concurrency parallel uploads. Retries are done by upload_file.
+    """
+    config = botocore.config.Config(
+        max_pool_connections=max(10, concurrency),
+        retries={"max_attempts": 1},
+        s3={"addressing_style": "path"},
+    )
+    return boto3.client("s3", endpoint_url=_endpoint(), region_name=os.getenv("AWS_REGION", "us-east-1"),
+                        aws_access_key_id="test", aws_secret_access_key="test", config=config)
 
-    # Upload loop with progress
-    for idx, fname in enumerate(to_process, start=1):
-        local_path = os.path.join(review_dir, fname)
-        s3_path = f"s3://reviews-input/{fname}"
-        cmd = ["awslocal", "s3", "cp", local_path, s3_path]
+def upload_file(s3, bucket: str, path: str, key: str, retries: int = 5) -> tuple:
+    """
+    Uploads one file, retrying failed attempts with exponential backoff and jitter.
+    Returns (latency in seconds of the successful attempt, retries used).
+    """
+    with open(path, "rb") as fh:
+        body = fh.read()
+    for attempt in range(retries + 1):
+        start = time.monotonic()
+        try:
+            s3.put_object(Bucket=bucket, Key=key, Body=body)
+            return time.monotonic() - start, attempt
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError):
+            if attempt == retries:
+                raise
+            time.sleep(min(0.1 * 2 ** attempt, 5.0) * random.uniform(0.5, 1.0))
 
-        # Progress indicator
-        print(f"\rUploading {idx}/{total} ({idx/total:.1%})", end='', flush=True)
+def upload_all(paths: list, bucket: str = BUCKET, concurrency: int = 16, rate: float = 0.0,
+               retries: int = 5, on_uploaded=None, report_every: float = 1.0, keys: list | None = None) -> dict:
+    """
+    Uploads paths with at most concurrency uploads in flight, started at no
+    more than rate objects per second (0 = no limit). Keys default to the
+    file names.
+    on_uploaded(key, upload_started) is called from the worker thread after
+    each successful upload, with the wall-clock time the upload started.
+    Returns the summary of the run.
+    """
+    s3 = make_s3_client(concurrency)
+    progress = _Progress(len(paths))
+    slots = threading.BoundedSemaphore(concurrency)
 
+    def _upload(path, key):
+        upload_started = time.time()
         try:
-            if os.name == "nt":
-                subprocess.run(" ".join(cmd), check=True, shell = True)
-            else:
-                subprocess.run(cmd, check=True)
+            latency, used = upload_file(s3, bucket, path, key, retries)
+        except Exception as e:
+            print(f"\nError uploading {key}: {e}")
+            progress.record(None, retries)
+        else:
+            progress.record(latency, used)
+            if on_uploaded is not None:
+                on_uploaded(key, upload_started)
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        last_report = time.monotonic()
+        if keys is None:
+            keys = [os.path.basename(path) for path in paths]
+        for idx, (path, key) in enumerate(zip(paths, keys)):
+            # Pace the start of each upload to the target rate
+            if rate > 0:
+                delay = progress.started + idx / rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            # Never queue more than concurrency uploads
+            slots.acquire()
+            pool.submit(_upload, path, key)
+            if time.monotonic() - last_report >= report_every:
+                progress.print_line()
+                last_report = time.monotonic()
+        # Keep reporting while the last uploads finish
+        while progress.done() < len(paths):
+            time.sleep(min(report_every, 0.2))
+            if time.monotonic() - last_report >= report_every:
+                progress.print_line()
+                last_report = time.monotonic()
+
+    progress.print_line(end="\n")
+    return progress.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("count", nargs="?", default=None, help="number of reviews, 'all' or '20%%'")
+    parser.add_argument("--dir", default=REVIEW_DIR, help="folder with the single review files")
+    parser.add_argument("--bucket", default=BUCKET, help="input bucket")
+    parser.add_argument("--concurrency", type=int, default=16, help="uploads in flight")
+    parser.add_argument("--rate", type=float, default=0.0, help="target uploads per second (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=5, help="retries per upload")
+    args = parser.parse_args()
+
+    # Gather JSON files
+    files = sorted(f for f in os.listdir(args.dir) if f.endswith('.json'))
+    if not files:
+        print("No files found in", args.dir)
+        return
+
+    try:
+        to_process = select_files(files, args.count)
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
 
-        except subprocess.CalledProcessError as e:
-            # Log error and continue
-            print(f"\nError uploading {fname}: {e}")
-            continue
+    print(f"Processing {len(to_process)} file(s)...")
+    summary = upload_all([os.path.join(args.dir, f) for f in to_process], bucket=args.bucket,
+                         concurrency=args.concurrency, rate=args.rate, retries=args.retries)
+    print(f"Done: {summary['uploaded']} uploaded, {summary['errors']} failed in {summary['elapsed_s']:.1f} s "
+          f"({summary['throughput']:.1f} obj/s, p99 {summary['p99_ms']:.0f} ms)")
 
-    # Final summary
-    print()  # Move to next line after progress
-    print(f"Done: attempted {total} uploads.")
 
 if __name__ == "__main__":
     main()
@@ -16,6 +16,7 @@ Usage:
 
 Ensure Python venv is activated and requirements installed.
 """
+import json
 import os
 import sys
 import time
@@ -37,13 +38,36 @@ RESOURCE_CONFIG = {
         "/app/buckets/input": "reviews-input",
         "/app/tables/reviews": "reviews",
         "/app/tables/users": "users" ,
-        "/app/tables/sentiment": "sentiment"
+        "/app/tables/sentiment": "sentiment",
+        "/app/tables/checkpoints": "ingest-checkpoints",
+        "/app/tables/stats": "stats",
+        "/app/tables/result-cache": "result-cache"
     },
     "lambdas": [
         "preprocess",
         "profanity_check",
         "sentiment_analysis"
-    ]
+    ],
+    # Scripts that generate packaged artifacts, run before zipping the Lambda
+    "build_steps": {
+        # The lemma table is built from the morphology, and only if the devset is there
+        "preprocess": ["scripts/build_wordnet_morphology.py", "scripts/build_lemma_table.py"],
+        "sentiment_analysis": ["scripts/build_vader_lexicon.py"]
+    },
+    # DynamoDB Stream -> Lambda batching (records per invocation, seconds to wait for a full batch)
+    "stream_batch_size": 100,
+    "stream_batching_window": 1,
+    # Stream records delivered to the Lambdas; the isUnpolite updates of
+    # profanity_check (MODIFY) never start an invocation
+    "stream_filter_patterns": [{"eventName": ["INSERT"]}],
+    # Where sentiment_analysis stores its results: "table" (legacy sentiment
+    # table), "reviews" (on the reviews rows) or "both"
+    "sentiment_storage": os.getenv("SENTIMENT_STORAGE", "table"),
+    # Whether profanity_check and sentiment_analysis back their in-container
+    # result cache with the result-cache table (RESULT_CACHE_TABLE on the Lambdas)
+    "result_cache_table": os.getenv("RESULT_CACHE_TABLE", "true"),
+    # Sparse index of the reviews table over the rows that carry a sentiment
+    "sentiment_index": {"IndexName": "sentiment-index", "KeyName": "sentiment"}
 }
 
 # AWS client factory
@@ -65,6 +89,13 @@ lambda_client = get_client("lambda")
 
 def package_lambda(fn_name: str):
     folder = Path("lambdas") / fn_name
+    # Modules every Lambda imports (config.py), kept once in the repository
+    shared = Path("lambdas") / "shared"
+
+    # Regenerate precompiled artifacts so they match the packaged sources
+    for script in RESOURCE_CONFIG['build_steps'].get(fn_name, []):
+        print(f"Running build step for {fn_name}: {script}")
+        subprocess.run([sys.executable, script], check=True)
 
     zipf_path = folder / "lambda.zip"
     
@@ -78,10 +109,25 @@ def package_lambda(fn_name: str):
             if file.is_dir() or file == zipf_path or file.name == ".DS_Store":
                 continue
             z.write(file, arcname=file.relative_to(folder))
+        for file in shared.glob("*.py"):
+            z.write(file, arcname=file.name)
     
     return str(zipf_path)
 
 
+def lambda_environment():
+    """
+    Environment for the deployed Lambdas. Every SSM parameter is also passed
+    as an override (/app/tables/reviews -> APP_TABLES_REVIEWS), so a cold
+    start resolves its resource names without calling SSM.
+    """
+    variables = {"STAGE": "local", "SENTIMENT_STORAGE": RESOURCE_CONFIG['sentiment_storage'],
+                 "RESULT_CACHE_TABLE": RESOURCE_CONFIG['result_cache_table']}
+    for name, value in RESOURCE_CONFIG['ssm_parameters'].items():
+        variables[name.strip("/").replace("/", "_").replace("-", "_").upper()] = value
+    return variables
+
+
 def deploy_lambda(fn_name, zip_path):
     print(f"Deploying Lambda: {fn_name}")
     try:
@@ -92,7 +138,7 @@ def deploy_lambda(fn_name, zip_path):
             Handler="handler.handler",
             Code={"ZipFile": open(zip_path, 'rb').read()},
             Timeout=3,
-            Environment={"Variables": {"STAGE": "local"}}
+            Environment={"Variables": lambda_environment()}
         )
     except botocore.exceptions.ClientError as e:
         code = e.response.get('Error', {}).get('Code')
@@ -101,6 +147,13 @@ def deploy_lambda(fn_name, zip_path):
                 FunctionName=fn_name,
                 ZipFile=open(zip_path, 'rb').read()
             )
+            # The configuration can only change once the code update is done;
+            # this brings new settings (SENTIMENT_STORAGE, overrides) to the function
+            lambda_client.get_waiter('function_updated').wait(FunctionName=fn_name)
+            lambda_client.update_function_configuration(
+                FunctionName=fn_name,
+                Environment={"Variables": lambda_environment()}
+            )
         else:
             raise
     # Poll until active
@@ -153,11 +206,25 @@ def create_s3_bucket(bucket_name):
 
 # Section: DynamoDB table creation with Streams
 
-def create_dynamodb_table(table_name, key_name, stream_enabled=False, stream_view_type="NEW_AND_OLD_IMAGES"):
+def _global_index(index_name, key_name):
+    # Keys-only projection: the index answers counts and id lookups
+    return {
+        "IndexName": index_name,
+        "KeySchema": [{'AttributeName': key_name, 'KeyType': 'HASH'}],
+        "Projection": {"ProjectionType": "KEYS_ONLY"}
+    }
+
+def create_dynamodb_table(table_name, key_name, stream_enabled=False, stream_view_type="NEW_AND_OLD_IMAGES",
+                          global_indexes=()):
+    """
+    global_indexes: (index name, string key attribute) pairs. An index
+    missing on an existing table is added to it.
+    """
     kwargs = {
         "TableName": table_name,
         "KeySchema": [{'AttributeName': key_name, 'KeyType': 'HASH'}],
-        "AttributeDefinitions": [{'AttributeName': key_name, 'AttributeType': 'S'}],
+        "AttributeDefinitions": [{'AttributeName': name, 'AttributeType': 'S'}
+                                 for name in dict.fromkeys([key_name, *(key for _, key in global_indexes)])],
         "BillingMode": 'PAY_PER_REQUEST'
     }
     if stream_enabled:
@@ -165,12 +232,23 @@ def create_dynamodb_table(table_name, key_name, stream_enabled=False, stream_vie
             "StreamEnabled": True,
             "StreamViewType": stream_view_type
         }
+    if global_indexes:
+        kwargs["GlobalSecondaryIndexes"] = [_global_index(index, key) for index, key in global_indexes]
     try:
         print(f"Creating DynamoDB table: {table_name}")
         ddb_client.create_table(**kwargs)
     except botocore.exceptions.ClientError as e:
         if e.response['Error']['Code'] == 'ResourceInUseException':
             print(f"Table {table_name} exists, skipping.")
+            existing = ddb_client.describe_table(TableName=table_name)['Table'].get('GlobalSecondaryIndexes', [])
+            for index, key in global_indexes:
+                if index not in {i['IndexName'] for i in existing}:
+                    print(f"Adding index {index} to {table_name}")
+                    ddb_client.update_table(
+                        TableName=table_name,
+                        AttributeDefinitions=[{'AttributeName': key, 'AttributeType': 'S'}],
+                        GlobalSecondaryIndexUpdates=[{"Create": _global_index(index, key)}]
+                    )
         else:
             raise
     waiter = ddb_client.get_waiter('table_exists')
@@ -182,6 +260,17 @@ def create_dynamodb_table(table_name, key_name, stream_enabled=False, stream_vie
         return desc['Table']['LatestStreamArn']
     return None
 
+def enable_time_to_live(table_name, attribute_name):
+    try:
+        ddb_client.update_time_to_live(
+            TableName=table_name,
+            TimeToLiveSpecification={"Enabled": True, "AttributeName": attribute_name}
+        )
+        print(f"TTL enabled on {table_name}.{attribute_name}")
+    except botocore.exceptions.ClientError as e:
+        # Already enabled, or not supported by the emulator: readers skip expired items anyway
+        print(f"TTL on {table_name} not changed: {e.response['Error']['Code']}")
+
 # Section: S3 notification configuration
 
 def create_s3_notification(bucket_name, lambda_name):
@@ -193,12 +282,35 @@ def create_s3_notification(bucket_name, lambda_name):
 
 # Section: DynamoDB Stream → Lambda mapping
 
-def create_dynamodb_event_mapping(stream_arn, function_name):
+def stream_filter_criteria(patterns=RESOURCE_CONFIG['stream_filter_patterns']):
+    return {"Filters": [{"Pattern": json.dumps(pattern)} for pattern in patterns]}
+
+def create_dynamodb_event_mapping(stream_arn, function_name,
+                                  batch_size=RESOURCE_CONFIG['stream_batch_size'],
+                                  batching_window=RESOURCE_CONFIG['stream_batching_window']):
+    # The handlers report failed records via batchItemFailures, so only those are retried
+    settings = {
+        "BatchSize": batch_size,
+        "MaximumBatchingWindowInSeconds": batching_window,
+        "FunctionResponseTypes": ['ReportBatchItemFailures'],
+        "FilterCriteria": stream_filter_criteria()
+    }
     mappings = lambda_client.list_event_source_mappings(EventSourceArn=stream_arn,FunctionName=function_name).get('EventSourceMappings', [])
     if mappings:
+        # Bring mappings of earlier setups up to date; without
+        # ReportBatchItemFailures, Lambda ignores the reported failures
+        for mapping in mappings:
+            if any(mapping.get(name) != value for name, value in settings.items()):
+                lambda_client.update_event_source_mapping(UUID=mapping['UUID'], **settings)
+                print(f"Updated mapping {mapping['UUID']} -> {function_name}")
         print(f"Mapping for {function_name} exists, skipping.")
         return
-    resp = lambda_client.create_event_source_mapping(EventSourceArn=stream_arn,FunctionName=function_name,StartingPosition='TRIM_HORIZON',BatchSize=1)
+    resp = lambda_client.create_event_source_mapping(
+        EventSourceArn=stream_arn,
+        FunctionName=function_name,
+        StartingPosition='TRIM_HORIZON',
+        **settings
+    )
     uuid = resp['UUID']
     # Poll mapping state
     for _ in range(20):
@@ -219,11 +331,14 @@ def main():
     users_table_name   = RESOURCE_CONFIG['ssm_parameters']['/app/tables/users']
     sentiment_table_name = RESOURCE_CONFIG['ssm_parameters']['/app/tables/sentiment']
 
-    # Create reviews table (with streams)
+    # Create reviews table (with streams),
+    # with the sparse sentiment index for SENTIMENT_STORAGE=reviews/both
+    sentiment_index = RESOURCE_CONFIG['sentiment_index']
     stream_arn = create_dynamodb_table(
         table_name=reviews_table_name,
         key_name="reviewId",
-        stream_enabled=True
+        stream_enabled=True,
+        global_indexes=[(sentiment_index['IndexName'], sentiment_index['KeyName'])]
     )
     # Create users table (no streams)
     create_dynamodb_table(
@@ -237,6 +352,27 @@ def main():
         table_name = sentiment_table_name,
         key_name="reviewId",
         stream_enabled=False)
+
+    # Create checkpoints table for JSON Lines ingest (no streams)
+    create_dynamodb_table(
+        table_name=RESOURCE_CONFIG['ssm_parameters']['/app/tables/checkpoints'],
+        key_name="objectId",
+        stream_enabled=False)
+
+    # Create stats table for the running moderation statistics (no streams)
+    create_dynamodb_table(
+        table_name=RESOURCE_CONFIG['ssm_parameters']['/app/tables/stats'],
+        key_name="statId",
+        stream_enabled=False)
+
+    # Create the shared result cache of profanity_check and sentiment_analysis,
+    # whose items expire through TTL on expiresAt (no streams)
+    result_cache_table_name = RESOURCE_CONFIG['ssm_parameters']['/app/tables/result-cache']
+    create_dynamodb_table(
+        table_name=result_cache_table_name,
+        key_name="contentHash",
+        stream_enabled=False)
+    enable_time_to_live(result_cache_table_name, "expiresAt")
     
 
     # Create event notification from s3 bucket to preprocessing lambda
@@ -1,9 +1,15 @@
 import os
+import sys
 import time
+from pathlib import Path
 import pytest
 import boto3
 import botocore.config
 
+# Modules shared by all Lambdas (config.py) are packaged into each of them;
+# the unit tests import them from their single copy
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "lambdas" / "shared"))
+
 
 #  Shared AWS clients wired to the localStack endpoint
 
@@ -41,9 +47,9 @@ def names(aws_clients):
         "sentiment": _get("tables/sentiment"),
     }
 
-#  Autouse session fixture – easier  lambda limits
+#  Session fixture – easier  lambda limits (used by the integration tests)
 
-@pytest.fixture(scope="session", autouse=True)
+@pytest.fixture(scope="session")
 def relax_lambda_timeouts(aws_clients):
     """
     LocalStack deploys each lambda with Timeout of 3s by default.
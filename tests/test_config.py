@@ -0,0 +1,56 @@
+"""
+Unit test – parameter cache of the shared config module
+
+What we verify
+──────────────
+- parameters are loaded with one SSM call and served from the snapshot
+  until CONFIG_TTL expires
+- a name that is not in SSM raises KeyError without reloading the
+  parameters on every lookup
+- an environment override wins without calling SSM
+"""
+
+import pytest
+
+import config
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls = []
+
+    def load_parameters():
+        calls.append(1)
+        return {"/app/tables/reviews": "reviews"}
+
+    monkeypatch.setattr(config, "_load_parameters", load_parameters)
+    monkeypatch.setattr(config, "_parameters", {})
+    monkeypatch.setattr(config, "_loaded_at", None)
+    monkeypatch.delenv("APP_TABLES_REVIEWS", raising=False)
+    return calls
+
+
+def test_parameters_are_cached(loads):
+    assert config.get_parameter("/app/tables/reviews") == "reviews"
+    assert config.get_parameter("/app/tables/reviews") == "reviews"
+    assert len(loads) == 1
+
+
+def test_missing_names_do_not_reload(loads):
+    for _ in range(3):
+        with pytest.raises(KeyError):
+            config.get_parameter("/app/tables/missing")
+    assert len(loads) == 1
+
+
+def test_expired_snapshot_is_reloaded(loads, monkeypatch):
+    config.get_parameter("/app/tables/reviews")
+    monkeypatch.setattr(config, "CONFIG_TTL", -1)
+    config.get_parameter("/app/tables/reviews")
+    assert len(loads) == 2
+
+
+def test_environment_override(loads, monkeypatch):
+    monkeypatch.setenv("APP_TABLES_REVIEWS", "other")
+    assert config.get_parameter("/app/tables/reviews") == "other"
+    assert loads == []
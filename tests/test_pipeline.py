@@ -9,6 +9,8 @@ What we verify
      - each review row has isUnpolite = True  
      - users table increments unpoliteCount correctly  
      - user is banned (banned = True) after the 4th offence (threshold = 4)
+- Redelivering the S3 event of a stored review neither counts the review
+  again (reviewCount stays 1) nor rewrites its row
 """
 
 import json
@@ -19,7 +21,10 @@ from pathlib import Path
 import pytest
 
 
-pytestmark = pytest.mark.integration   # run via:  pytest -m integration -v
+pytestmark = [
+    pytest.mark.integration,           # run via:  pytest -m integration -v
+    pytest.mark.usefixtures("relax_lambda_timeouts"),
+]
 
 # Helpers
 def _make_review(reviewer_id: str,
@@ -165,3 +170,33 @@ def test_pipeline_requirements(aws_clients, names):
                        banned=expected_banned)
 
 
+
+
+# ────────────────────────────────────────────────────────────────
+# Redelivered S3 events
+# ────────────────────────────────────────────────────────────────
+def test_redelivered_event_is_ignored(aws_clients, names):
+    s3  = aws_clients["s3"]
+    ddb = aws_clients["dynamodb"]
+
+    reviewer_id = f"user_redelivered_{uuid.uuid4().hex[:8]}"
+    review = _make_review(
+        reviewer_id=reviewer_id,
+        text="Solid product, does what it says.",
+        summary="Good",
+        overall=4.0
+    )
+    key = f"{uuid.uuid4()}.json"
+    s3.put_object(Bucket=names["bucket"], Key=key, Body=json.dumps(review).encode())
+    _wait_for_review(ddb, names["reviews"], key, expect_unpolite=False)
+
+    # Deliver the notification of the same object version twice more
+    event = {"Records": [{"s3": {"bucket": {"name": names["bucket"]}, "object": {"key": key}}}]}
+    for _ in range(2):
+        response = aws_clients["lambda"].invoke(FunctionName="preprocess", Payload=json.dumps(event).encode())
+        result = json.loads(response["Payload"].read())
+        assert result["processed"] == 0
+        assert result["duplicates"] == 1
+
+    user = ddb.get_item(TableName=names["users"], Key={"userId": {"S": reviewer_id}}, ConsistentRead=True)["Item"]
+    assert _dynamo_value(user, "reviewCount") == 1
@@ -0,0 +1,117 @@
+"""
+Unit test – JSON Lines ingest of preprocess
+
+What we verify
+──────────────
+- lines are split correctly across read boundaries, keep their line
+  breaks (so byte offsets add up) and a missing final line break is fine
+- only .jsonl objects (optionally .gz/.zst compressed) take the bulk
+  ingest path
+- compression is detected from Content-Encoding or the key suffix and
+  the body is decompressed while it is read
+- review counts are sent with the checkpoint in transactions of at most
+  TRANSACT_REVIEWERS reviewers, and lines counted already are skipped
+"""
+
+import gzip
+import io
+import sys
+from types import SimpleNamespace
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lambdas" / "preprocess"))
+
+import ingest_ops  # noqa: E402
+
+
+@pytest.mark.parametrize("read_size", [1, 3, 7, 64 * 1024])
+def test_iter_lines(monkeypatch, read_size):
+    monkeypatch.setattr(ingest_ops, "READ_SIZE", read_size)
+    data = b'{"a": 1}\n\n{"b": "\xc3\xa9"}\n{"c": 3}'
+
+    lines = list(ingest_ops._iter_lines(io.BytesIO(data)))
+
+    assert lines == [b'{"a": 1}\n', b"\n", b'{"b": "\xc3\xa9"}\n', b'{"c": 3}']
+    assert sum(len(line) for line in lines) == len(data)
+
+
+@pytest.mark.parametrize("key, expected", [
+    ("dump.jsonl", True),
+    ("exports/dump.jsonl.gz", True),
+    ("exports/dump.jsonl.zst", True),
+    ("review_000001.json", False),
+    ("dump.jsonl.bak", False),
+    ("review_000001.json.gz", False),
+])
+def test_is_jsonl(key, expected):
+    assert ingest_ops.is_jsonl(key) is expected
+
+
+@pytest.mark.parametrize("key, content_encoding, expected", [
+    ("review.json", None, None),
+    ("review.json.gz", None, "gzip"),
+    ("dump.jsonl.zst", None, "zstd"),
+    ("dump.jsonl", "gzip", "gzip"),
+    ("dump.jsonl", "zstd", "zstd"),
+    ("dump.jsonl.gz", "identity", "gzip"),
+])
+def test_compression(key, content_encoding, expected):
+    assert ingest_ops.compression(key, content_encoding) == expected
+
+
+def test_open_body_gzip():
+    data = b'{"a": 1}\n{"b": 2}\n' * 1000
+    response = {"Body": io.BytesIO(gzip.compress(data)), "ContentEncoding": "gzip"}
+    assert b"".join(ingest_ops._iter_lines(ingest_ops.open_body(response, "dump.jsonl"))) == data
+
+
+def test_open_body_zstd():
+    zstandard = pytest.importorskip("zstandard")
+    data = b'{"a": 1}\n{"b": 2}\n' * 1000
+    response = {"Body": io.BytesIO(zstandard.ZstdCompressor().compress(data))}
+    assert b"".join(ingest_ops._iter_lines(ingest_ops.open_body(response, "dump.jsonl.zst"))) == data
+
+
+@pytest.fixture
+def transactions(monkeypatch):
+    sent = []
+    monkeypatch.setattr(ingest_ops, "TRANSACT_REVIEWERS", 2)
+    monkeypatch.setattr(ingest_ops, "_checkpoint_table", lambda: SimpleNamespace(name="checkpoints"))
+    monkeypatch.setattr(ingest_ops, "register_review_item", lambda reviewer_id, count: (reviewer_id, count))
+    monkeypatch.setattr(ingest_ops, "transact_write", lambda items: sent.append(items) or True)
+    return sent
+
+
+def _counted_range(item: dict) -> tuple:
+    values = item["Update"]["ExpressionAttributeValues"]
+    return int(values[":s"]), int(values[":c"])
+
+
+def test_count_reviews_groups_reviewers_per_transaction(transactions):
+    reviewers = [(10, "A"), (11, "B"), (12, "A"), (13, "C"), (15, "B")]
+
+    assert ingest_ops.count_reviews("bucket", "dump.jsonl", "etag", 10, 20, reviewers)
+
+    assert [_counted_range(items[0]) for items in transactions] == [(10, 13), (13, 20)]
+    assert [items[1:] for items in transactions] == [[("A", 2), ("B", 1)], [("C", 1), ("B", 1)]]
+
+
+def test_count_reviews_skips_counted_lines(transactions):
+    reviewers = [(0, "A"), (1, "B"), (2, "C")]
+
+    assert ingest_ops.count_reviews("bucket", "dump.jsonl", "etag", 2, 3, reviewers)
+    assert ingest_ops.count_reviews("bucket", "dump.jsonl", "etag", 3, 3, reviewers)
+
+    assert [_counted_range(items[0]) for items in transactions] == [(2, 3)]
+    assert transactions[0][1:] == [("C", 1)]
+    # Only the first lines of an object version reset its checkpoint
+    assert "linesDone = :z" not in transactions[0][0]["Update"]["UpdateExpression"]
+
+
+def test_count_reviews_stops_when_another_invocation_counts(transactions, monkeypatch):
+    monkeypatch.setattr(ingest_ops, "transact_write", lambda items: False)
+
+    assert not ingest_ops.count_reviews("bucket", "dump.jsonl", "etag", 0, 2, [(0, "A"), (1, "B"), (1, "C")])
@@ -0,0 +1,121 @@
+"""
+Unit test – preprocess lemma lookups
+
+What we verify
+──────────────
+- lemma_table.tsv files are parsed into a word -> lemma dict
+- words in the precomputed table never reach the lemmatiser
+- other words are lemmatised once and then served from the LRU cache,
+  and lemma_stats counts every kind of lookup
+- preprocess_batch gives the same texts as preprocess, lemmatising every
+  distinct token of the batch once
+- the bundled WordNet morphology gives the same lemmas as NLTK's
+  WordNetLemmatizer (compared directly when NLTK and WordNet are available)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lambdas" / "preprocess"))
+
+import text_ops  # noqa: E402
+from morphy import MorphyLemmatiser  # noqa: E402
+
+# (word, pos, lemma) as returned by WordNetLemmatizer
+KNOWN_LEMMAS = [
+    ("products", "n", "product"),
+    ("batteries", "n", "battery"),
+    ("geese", "n", "goose"),
+    ("corpora", "n", "corpus"),
+    ("boxes", "n", "box"),
+    ("wolves", "n", "wolf"),
+    ("women", "n", "woman"),
+    ("was", "n", "wa"),
+    ("great", "n", "great"),
+    ("xyzzy", "n", "xyzzy"),
+    ("running", "v", "run"),
+    ("went", "v", "go"),
+    ("better", "a", "good"),
+    ("happiest", "s", "happy"),
+]
+
+
+class FakeLemmatiser:
+    def __init__(self):
+        self.calls = []
+
+    def lemmatize(self, token):
+        self.calls.append(token)
+        return token.rstrip("s")
+
+
+@pytest.fixture
+def lemmatiser(monkeypatch):
+    fake = FakeLemmatiser()
+    monkeypatch.setattr(text_ops, "get_lemmatiser", lambda: fake)
+    monkeypatch.setattr(text_ops, "LEMMA_TABLE", {"products": "product"})
+    text_ops._cached_lemma.cache_clear()
+    yield fake
+    text_ops._cached_lemma.cache_clear()
+
+
+def test_load_lemma_table(tmp_path):
+    path = tmp_path / "lemma_table.tsv"
+    path.write_text("# header\nproducts\tproduct\nworks\twork\n", encoding="utf-8")
+    assert text_ops._load_lemma_table(path) == {"products": "product", "works": "work"}
+    assert text_ops._load_lemma_table(tmp_path / "missing.tsv") == {}
+
+
+def test_lemmatize_uses_table_then_cache(lemmatiser):
+    before = text_ops.lemma_stats()
+    lemmas = [text_ops.lemmatize(t) for t in ["products", "batteries", "batteries", "products", "works"]]
+
+    assert lemmas == ["product", "batterie", "batterie", "product", "work"]
+    assert lemmatiser.calls == ["batteries", "works"]
+
+    stats = text_ops.lemma_stats()
+    assert stats["table_hits"] - before["table_hits"] == 2
+    assert stats["cache_hits"] == 1
+    assert stats["cache_misses"] == 2
+    assert stats["cache_size"] == 2
+
+
+def test_preprocess_batch_matches_preprocess(lemmatiser):
+    reviews = [("Great products", "The batteries work"), ("Bad", "Batteries died, products broke"), ("", "")]
+    expected = [text_ops.preprocess(summary, review_text) for summary, review_text in reviews]
+    text_ops._cached_lemma.cache_clear()
+    lemmatiser.calls.clear()
+
+    assert text_ops.preprocess_batch(reviews) == expected
+    assert sorted(lemmatiser.calls) == sorted(set(lemmatiser.calls))
+
+
+@pytest.fixture(scope="module")
+def morphy():
+    lemmatiser = MorphyLemmatiser.load()
+    assert lemmatiser is not None, "wordnet_morphy.marshal is missing, run scripts/build_wordnet_morphology.py"
+    return lemmatiser
+
+
+@pytest.mark.parametrize("word, pos, lemma", KNOWN_LEMMAS)
+def test_morphy_lemmas(morphy, word, pos, lemma):
+    assert morphy.lemmatize(word, pos) == lemma
+
+
+def test_morphy_matches_nltk(morphy):
+    try:
+        from nltk.stem import WordNetLemmatizer
+
+        nltk_lemmatiser = WordNetLemmatizer()
+        nltk_lemmatiser.lemmatize("warm")
+    except (ImportError, LookupError) as e:
+        pytest.skip(f"NLTK WordNet not available: {e}")
+
+    words = [word for word, _, _ in KNOWN_LEMMAS] + text_ops.preprocess(
+        "Great product", "The batteries were dying after two weeks, my kids loved the boxes and the geese"
+    ).split()
+    for pos in ("n", "v", "a", "r", "s"):
+        assert [morphy.lemmatize(w, pos) for w in words] == [nltk_lemmatiser.lemmatize(w, pos) for w in words]
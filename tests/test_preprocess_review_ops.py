@@ -0,0 +1,110 @@
+"""
+Unit test – transactions of preprocess review_ops
+
+What we verify
+──────────────
+- a transaction cancelled by a conflicting write (e.g. on the shared users
+  row) is retried until it goes through
+- a failed condition returns False without another attempt
+- other cancellations, and conflicts that outlast every attempt, are raised
+- the new reviews of a reviewer share transactions of at most
+  TRANSACT_REVIEWS puts and one reviewCount increment; a review that
+  exists already is left out and the rest is written without it
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lambdas" / "preprocess"))
+
+import review_ops  # noqa: E402
+
+
+class TransactionCanceled(Exception):
+    def __init__(self, *codes):
+        super().__init__("cancelled")
+        self.response = {"CancellationReasons": [{"Code": code} for code in codes]}
+
+
+class FakeClient:
+    exceptions = SimpleNamespace(TransactionCanceledException=TransactionCanceled)
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.requests = []
+
+    def transact_write_items(self, TransactItems):
+        self.calls += 1
+        self.requests.append(TransactItems)
+        outcome = self.outcomes.pop(0) if self.outcomes else None
+        if outcome is not None:
+            raise outcome
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    monkeypatch.setattr(review_ops.time, "sleep", lambda seconds: None)
+
+    monkeypatch.setattr(review_ops, "_table", lambda: SimpleNamespace(name="reviews"))
+    monkeypatch.setattr(review_ops, "register_review_item", lambda reviewer_id, count: ("users", reviewer_id, count))
+
+    def install(*outcomes):
+        ddb = FakeClient(*outcomes)
+        monkeypatch.setattr(review_ops, "client", lambda name: ddb)
+        return ddb
+    return install
+
+
+def test_conflicts_are_retried(fake_client):
+    ddb = fake_client(TransactionCanceled("None", "TransactionConflict"),
+                      TransactionCanceled("None", "TransactionConflict"))
+    assert review_ops.transact_write([{}]) is True
+    assert ddb.calls == 3
+
+
+def test_failed_condition_returns_false(fake_client):
+    ddb = fake_client(TransactionCanceled("ConditionalCheckFailed", "None"))
+    assert review_ops.transact_write([{}]) is False
+    assert ddb.calls == 1
+
+
+def test_other_cancellations_are_raised(fake_client):
+    ddb = fake_client(TransactionCanceled("ValidationError"))
+    with pytest.raises(TransactionCanceled):
+        review_ops.transact_write([{}])
+    assert ddb.calls == 1
+
+
+def test_lasting_conflicts_are_raised(fake_client):
+    ddb = fake_client(*[TransactionCanceled("TransactionConflict")] * review_ops.TRANSACT_ATTEMPTS)
+    with pytest.raises(TransactionCanceled):
+        review_ops.transact_write([{}])
+    assert ddb.calls == review_ops.TRANSACT_ATTEMPTS
+
+
+def _review(review_id: str) -> dict:
+    return {"reviewId": review_id, "reviewerId": "A"}
+
+
+def test_new_reviews_share_one_increment(fake_client, monkeypatch):
+    monkeypatch.setattr(review_ops, "TRANSACT_REVIEWS", 2)
+    ddb = fake_client()
+
+    assert review_ops.put_new_reviews([_review("r1"), _review("r2"), _review("r3")]) == [True, True, True]
+
+    assert [[item["Put"]["Item"]["reviewId"] for item in request[:-1]] for request in ddb.requests] == [["r1", "r2"], ["r3"]]
+    assert [request[-1] for request in ddb.requests] == [("users", "A", 2), ("users", "A", 1)]
+
+
+def test_existing_reviews_are_left_out(fake_client):
+    ddb = fake_client(TransactionCanceled("None", "ConditionalCheckFailed", "None", "None"))
+
+    assert review_ops.put_new_reviews([_review("r1"), _review("r2"), _review("r3"), _review("r1")]) == [True, False, True, False]
+
+    assert [item["Put"]["Item"]["reviewId"] for item in ddb.requests[1][:-1]] == ["r1", "r3"]
+    assert ddb.requests[1][-1] == ("users", "A", 2)
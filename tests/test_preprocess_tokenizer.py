@@ -0,0 +1,111 @@
+"""
+Unit test – preprocess tokenizer
+
+What we verify
+──────────────
+- the regex tokenizer returns the same words as word_tokenize for plain
+  review text and the Treebank edge cases (contractions, hyphenation, ...)
+- the known differences are still the documented ones: words the nltk
+  mode drops because of Punkt or a clitic at the end of a line, the
+  Treebank splits of "gonna"-like words, abbreviations inside a sentence,
+  leading-apostrophe contractions and a full stop followed by more
+  punctuation ("word.,")
+- the regex mode never imports NLTK
+
+The nltk comparisons are skipped when NLTK or its Punkt data is missing.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+PREPROCESS_DIR = ROOT / "lambdas" / "preprocess"
+sys.path.insert(0, str(PREPROCESS_DIR))
+
+from text_ops import tokenize  # noqa: E402
+
+SAME = [
+    "this product works great and the price is right.",
+    "5 stars. would buy again.",
+    # Treebank splits off "n't" and the clitics
+    "i don't like it, it's broken!",
+    "can't won't shouldn't i'm we've they'll",
+    "wasn't isn't aren't didn't",
+    "the product's quality",
+    "the kids' toys and james' book",
+    "i'd say it's 'great'",
+    # Hyphenated and other glued words are a single, non-alphabetic token
+    "well-made, long-lasting item",
+    "can't-miss deal",
+    "hello__world a/b c|d",
+    "rock'n'roll o'clock",
+    # Digits and non-ASCII letters make the whole token non-alphabetic
+    "mp3 player 2nd gen",
+    "café crème",
+    # Abbreviations
+    "e.g. the u.s. version",
+    "i.e. a b.c end.",
+    # Punctuation around words
+    "great!!!fantastic...really",
+    '"quoted" (paren) [bracket]',
+    "price: $20; shipping: free",
+    "1,000 units, a,b ratio:1 note: good",
+    "it was ok -- not great",
+    "love it!!! :) <3",
+]
+
+# (text, regex tokens, nltk tokens)
+DIFFERENT = [
+    # Punkt takes a single letter before a full stop for an abbreviation
+    ("i. love it", ["i", "love", "it"], ["love", "it"]),
+    # Treebank only splits off a clitic that is followed by a space
+    ("it's\ngreat", ["it", "great"], ["great"]),
+    # Treebank splits these words in two (CONTRACTIONS2/3); the regex keeps one word
+    ("gonna wanna gimme lemme", ["gonna", "wanna", "gimme", "lemme"],
+     ["gon", "na", "wan", "na", "gim", "me", "lem", "me"]),
+    ("cannot gotta", ["cannot", "gotta"], ["can", "not", "got", "ta"]),
+    # Punkt keeps "mr." inside a sentence as one non-alphabetic token
+    ("ask mr. smith in st. louis vs. boston", ["ask", "mr", "smith", "in", "st", "louis", "vs", "boston"],
+     ["ask", "smith", "in", "louis", "boston"]),
+    # A leading apostrophe glues the word for the regex; Treebank splits it off
+    ("'tis more'n d'ye see", ["see"], ["is", "more", "d", "see"]),
+    # Treebank only splits off a full stop at the end of the text, so
+    # "good." stays one non-alphabetic token before "," or "!"
+    ("it is good., very fast", ["it", "is", "good", "very", "fast"], ["it", "is", "very", "fast"]),
+    ("great.! love it", ["great", "love", "it"], ["love", "it"]),
+]
+
+
+@pytest.fixture(scope="module")
+def nltk_tokenize():
+    try:
+        tokenize("warm up", mode="nltk")
+    except (ImportError, LookupError) as e:
+        pytest.skip(f"NLTK tokenizer not available: {e}")
+    return lambda text: tokenize(text, mode="nltk")
+
+
+@pytest.mark.parametrize("text", SAME)
+def test_regex_matches_nltk(nltk_tokenize, text):
+    assert tokenize(text, mode="regex") == nltk_tokenize(text)
+
+
+@pytest.mark.parametrize("text, regex_tokens, nltk_tokens", DIFFERENT)
+def test_known_differences(nltk_tokenize, text, regex_tokens, nltk_tokens):
+    assert tokenize(text, mode="regex") == regex_tokens
+    assert nltk_tokenize(text) == nltk_tokens
+
+
+def test_regex_tokenizer():
+    assert tokenize("i don't like the well-made mp3 player", mode="regex") == ["i", "do", "like", "the", "player"]
+
+
+def test_regex_mode_does_not_import_nltk():
+    code = "import sys, text_ops; text_ops.tokenize('great product'); print('nltk' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PREPROCESS_DIR, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
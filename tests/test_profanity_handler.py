@@ -0,0 +1,92 @@
+"""
+Unit test – offence registration of the profanity_check handler
+
+What we verify
+──────────────
+- consecutive offences of a reviewer are registered with one update
+- a failed update stops the registration: the handler reports the first
+  offence of the failed run, no offence after it was registered, so the
+  retried records are never counted twice
+- profaneReviews only counts the offences that were registered
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+LAMBDA_DIR = ROOT / "lambdas" / "profanity_check"
+sys.path.insert(0, str(LAMBDA_DIR))
+
+_spec = importlib.util.spec_from_file_location("profanity_handler", LAMBDA_DIR / "handler.py")
+profanity_handler = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(profanity_handler)
+
+from result_cache import ResultCache  # noqa: E402
+
+
+def _record(sequence_number: str, reviewer_id: str, profane: bool = True) -> dict:
+    return {
+        "eventName": "INSERT",
+        "dynamodb": {
+            "SequenceNumber": sequence_number,
+            "NewImage": {
+                "reviewId": {"S": f"r{sequence_number}"},
+                "reviewerId": {"S": reviewer_id},
+                "content": {"S": "bad" if profane else "fine"},
+            },
+        },
+    }
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    registered = []
+    stats = []
+    failing = set()
+
+    def register_profanity(reviewer_id, threshold, count):
+        if reviewer_id in failing:
+            raise RuntimeError("throttled")
+        registered.append((reviewer_id, count))
+        return False
+
+    def process_record(record):
+        image = record["dynamodb"]["NewImage"]
+        return image["reviewerId"]["S"] if image["content"]["S"] == "bad" else None
+
+    monkeypatch.setattr(profanity_handler, "register_profanity", register_profanity)
+    monkeypatch.setattr(profanity_handler, "_process_record", process_record)
+    monkeypatch.setattr(profanity_handler, "add_stats", stats.append)
+    monkeypatch.setattr(profanity_handler, "profanity_cache", ResultCache("test:v1", maxsize=10, use_table=False))
+    return registered, stats, failing
+
+
+def test_consecutive_offences_are_registered_once(stubs):
+    registered, stats, _ = stubs
+    event = {"Records": [_record("100", "A"), _record("150", "B", profane=False),
+                         _record("200", "A"), _record("300", "B")]}
+    assert profanity_handler.handler(event, None) == {"batchItemFailures": []}
+    assert registered == [("A", 2), ("B", 1)]
+    assert stats[0]["profaneReviews"] == 3
+
+
+def test_failed_registration_stops_before_later_offences(stubs):
+    registered, stats, failing = stubs
+    failing.add("A")
+    event = {"Records": [_record("100", "A"), _record("200", "B")]}
+    assert profanity_handler.handler(event, None) == {"batchItemFailures": [{"itemIdentifier": "100"}]}
+    # The retry replays record 200, so B must not be registered yet
+    assert registered == []
+    assert stats[0]["profaneReviews"] == 0
+
+
+def test_runs_before_the_failure_stay_registered(stubs):
+    registered, stats, failing = stubs
+    failing.add("B")
+    event = {"Records": [_record("100", "A"), _record("200", "B"), _record("300", "A")]}
+    assert profanity_handler.handler(event, None) == {"batchItemFailures": [{"itemIdentifier": "200"}]}
+    assert registered == [("A", 1)]
+    assert stats[0]["profaneReviews"] == 1
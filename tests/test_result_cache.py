@@ -0,0 +1,76 @@
+"""
+Unit test – result cache of profanity_check and sentiment_analysis
+
+What we verify
+──────────────
+- results are found again by content, and not across namespaces
+- the least recently used result is evicted once maxsize is exceeded
+- take_stats counts hits and misses, gives the hit rate and resets
+- without the cache table, put never queues writes and flush is a no-op
+- both Lambdas ship the same result_cache.py
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lambdas" / "profanity_check"))
+
+from result_cache import ResultCache  # noqa: E402
+
+
+def test_results_are_found_by_content():
+    cache = ResultCache("test:v1", maxsize=10, use_table=False)
+    assert cache.get("great product") is None
+    cache.put("great product", {"compound": 0.6249})
+    assert cache.get("great product") == {"compound": 0.6249}
+    assert cache.get("great product!") is None
+
+
+def test_falsy_results_are_hits():
+    cache = ResultCache("test:v1", maxsize=10, use_table=False)
+    cache.put("fine", False)
+    assert cache.get("fine") is False
+
+
+def test_namespaces_are_separate():
+    profanity = ResultCache("profanity:v1", maxsize=10, use_table=False)
+    sentiment = ResultCache("sentiment:v1", maxsize=10, use_table=False)
+    assert profanity._key("text") != sentiment._key("text")
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache("test:v1", maxsize=2, use_table=False)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_take_stats_reports_and_resets():
+    cache = ResultCache("test:v1", maxsize=10, use_table=False)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    cache.get("c")
+    stats = cache.take_stats()
+    assert stats == {"local_hits": 2, "table_hits": 0, "misses": 2, "hit_rate": 0.5, "size": 1}
+    assert cache.take_stats()["hit_rate"] is None
+
+
+def test_without_table_nothing_is_written():
+    cache = ResultCache("test:v1", maxsize=10, use_table=False)
+    cache.put("a", 1)
+    assert cache._pending == {}
+    cache.prefetch(["a", "b"])
+    cache.flush()
+
+
+def test_lambdas_ship_the_same_module():
+    profanity = ROOT / "lambdas" / "profanity_check" / "result_cache.py"
+    sentiment = ROOT / "lambdas" / "sentiment_analysis" / "result_cache.py"
+    assert profanity.read_bytes() == sentiment.read_bytes()
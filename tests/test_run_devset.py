@@ -0,0 +1,31 @@
+"""
+Unit test – upload progress of run_devset
+
+What we verify
+──────────────
+- the progress line reports the share of finished uploads
+- a run without any file (empty devset or everything filtered out)
+  reports 100% instead of dividing by zero
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import run_devset  # noqa: E402
+
+
+def test_progress_line(capsys):
+    progress = run_devset._Progress(4)
+    progress.record(0.01, 0)
+    progress.record(None, 5)
+    progress.print_line(end="\n")
+    assert "Uploaded 2/4 (50.0%)" in capsys.readouterr().out
+
+
+def test_empty_upload(capsys):
+    summary = run_devset.upload_all([])
+    assert summary["uploaded"] == 0 and summary["errors"] == 0
+    assert "Uploaded 0/0 (100.0%)" in capsys.readouterr().out
@@ -0,0 +1,80 @@
+"""
+Unit test – result writes of the sentiment_analysis handler
+
+What we verify
+──────────────
+- a review that comes twice in one batch (a redelivered record) is
+  written once, with its last item, since BatchWriteItem rejects
+  duplicate keys in a request
+- its label is counted once in the moderation statistics
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+LAMBDA_DIR = ROOT / "lambdas" / "sentiment_analysis"
+sys.path.insert(0, str(LAMBDA_DIR))
+
+_spec = importlib.util.spec_from_file_location("sentiment_handler", LAMBDA_DIR / "handler.py")
+sentiment_handler = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sentiment_handler)
+
+from result_cache import ResultCache  # noqa: E402
+
+
+def _record(sequence_number: str, review_id: str, content: str, overall: str = "3.0") -> dict:
+    return {
+        "eventName": "INSERT",
+        "dynamodb": {
+            "SequenceNumber": sequence_number,
+            "NewImage": {
+                "reviewId": {"S": review_id},
+                "content": {"S": content},
+                "overall": {"N": overall},
+            },
+        },
+    }
+
+
+class FakeDynamoDB:
+    def __init__(self):
+        self.requests = []
+
+    def batch_write_item(self, RequestItems):
+        for requests in RequestItems.values():
+            keys = [request["PutRequest"]["Item"]["reviewId"] for request in requests]
+            if len(keys) != len(set(keys)):
+                raise ValueError("Provided list of item keys contains duplicates")
+        self.requests.append(RequestItems)
+        return {}
+
+
+@pytest.fixture
+def ddb(monkeypatch):
+    fake = FakeDynamoDB()
+    stats = []
+    monkeypatch.setattr(sentiment_handler, "client", lambda name: fake)
+    monkeypatch.setattr(sentiment_handler, "get_parameter", lambda name: "sentiment")
+    monkeypatch.setattr(sentiment_handler, "add_stats", stats.append)
+    monkeypatch.setattr(sentiment_handler, "SENTIMENT_STORAGE", "table")
+    monkeypatch.setattr(sentiment_handler, "sentiment_cache", ResultCache("test:v1", maxsize=10, use_table=False))
+    fake.stats = stats
+    return fake
+
+
+def test_duplicate_review_is_written_once(ddb):
+    event = {"Records": [_record("100", "r1", "love great product"),
+                         _record("200", "r2", "terrible broken waste"),
+                         _record("300", "r1", "love great product", overall="5.0")]}
+
+    assert sentiment_handler.handler(event, None) == {"batchItemFailures": []}
+
+    items = [request["PutRequest"]["Item"] for request in ddb.requests[0]["sentiment"]]
+    assert [item["reviewId"] for item in items] == ["r2", "r1"]
+    assert items[1]["overall"] == 5
+    assert ddb.stats[0]["positiveReviews"] == 1
+    assert ddb.stats[0]["negativeReviews"] == 1
@@ -0,0 +1,64 @@
+"""
+Unit test – sentiment score encoding and labelling policy
+
+What we verify
+──────────────
+- encode_scores/decode_scores round-trip the VADER scores exactly,
+  including the extremes of every field
+- encoded scores are non-negative integers of at most 17 digits
+- classify keeps the labels of the original cut-offs and rating rules,
+  and follows a changed policy
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lambdas" / "sentiment_analysis"))
+
+from score_ops import POLICY, classify, decode_scores, encode_scores  # noqa: E402
+
+SCORES = [
+    {"neg": 0.0, "neu": 0.508, "pos": 0.492, "compound": 0.6249},
+    {"neg": 0.646, "neu": 0.354, "pos": 0.0, "compound": -0.8658},
+    {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0},
+    {"neg": 1.0, "neu": 0.0, "pos": 0.0, "compound": -1.0},
+    {"neg": 0.0, "neu": 0.0, "pos": 1.0, "compound": 1.0},
+]
+
+
+@pytest.mark.parametrize("scores", SCORES)
+def test_scores_round_trip(scores):
+    value = encode_scores(scores)
+    assert isinstance(value, int) and 0 <= value < 10 ** 17
+    assert decode_scores(value) == scores
+
+
+def test_decode_accepts_stored_numbers():
+    from decimal import Decimal
+    value = encode_scores(SCORES[0])
+    assert decode_scores(Decimal(value)) == decode_scores(str(value)) == SCORES[0]
+
+
+@pytest.mark.parametrize("compound, overall, label", [
+    (0.6249, 5.0, "POSITIVE"),
+    (0.6249, 1.0, "NEUTRAL"),
+    (-0.8658, 1.0, "NEGATIVE"),
+    (-0.8658, 5.0, "NEUTRAL"),
+    (0.0, 5.0, "POSITIVE"),
+    (0.0, 1.0, "NEGATIVE"),
+    (0.0, 3.0, "NEUTRAL"),
+    (0.05, None, "POSITIVE"),
+    (-0.05, None, "NEGATIVE"),
+])
+def test_default_policy(compound, overall, label):
+    assert classify(compound, overall) == label
+
+
+def test_changed_policy():
+    strict = {**POLICY, "positive": 0.5, "negative": -0.5}
+    assert classify(0.3, 3.0) == "POSITIVE"
+    assert classify(0.3, 3.0, strict) == "NEUTRAL"
+    assert classify(-0.3, 3.0, strict) == "NEUTRAL"
@@ -0,0 +1,43 @@
+"""
+Unit test – VADER scorer
+
+What we verify
+──────────────
+- polarity_scores returns exactly the scores recorded from the original
+  vaderSentiment 3.3.2 scorer for every text in data/vader_regression.jsonl
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lambdas" / "sentiment_analysis"))
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer  # noqa: E402
+
+CORPUS = Path(__file__).parent / "data" / "vader_regression.jsonl"
+
+
+def _corpus():
+    with CORPUS.open(encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return SentimentIntensityAnalyzer()
+
+
+@pytest.mark.parametrize("case", _corpus(), ids=lambda case: case["text"][:40])
+def test_polarity_scores_match_reference(analyzer, case):
+    assert analyzer.polarity_scores(case["text"]) == case["scores"]
+
+
+def test_polarity_scores_batch_matches_scalar(analyzer):
+    texts = [case["text"] for case in _corpus()]
+    # duplicates must get their own, equal result
+    texts += texts[:10]
+    assert analyzer.polarity_scores_batch(texts) == [analyzer.polarity_scores(t) for t in texts]